@@ -28,15 +28,89 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_key: SecretStr
     supabase_storage_bucket: str = "resumes"
+    # Pooled HTTP connections from each worker to PostgREST
+    db_max_connections: int = 20
+    db_max_keepalive_connections: int = 10
+    db_timeout: float = 30.0
 
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "mistral"
+    # Shared Ollama connection pool and per-phase timeouts (seconds)
+    ollama_max_connections: int = 10
+    ollama_max_keepalive_connections: int = 5
+    ollama_keepalive_seconds: float = 60.0
+    ollama_connect_timeout: float = 5.0
+    ollama_read_timeout: float = 120.0
+    ollama_write_timeout: float = 10.0
+    ollama_pool_timeout: float = 10.0
+    # Ollama circuit breaker: opens when at least this share of the recent
+    # calls failed (calls slower than the slow threshold count as failures)
+    ollama_breaker_failure_rate: float = 0.5
+    ollama_breaker_min_calls: int = 4
+    ollama_breaker_window: int = 20
+    ollama_breaker_open_seconds: float = 30.0
+    ollama_breaker_slow_seconds: float = 90.0
+    # Seconds between background health probes of Ollama
+    ollama_probe_interval: float = 30.0
+    # Exponential backoff with full jitter between LLM retries
+    ollama_retry_base_seconds: float = 1.0
+    ollama_retry_max_seconds: float = 10.0
+    # Estimated-token budgets for the resume and job description in LLM prompts
+    llm_resume_token_budget: int = 1200
+    llm_jd_token_budget: int = 600
+    # Generations Ollama runs at once; further requests wait in a bounded queue
+    llm_max_concurrency: int = 2
+    llm_max_queue: int = 32
+    # Initial guess for one generation, refined from observed durations
+    llm_expected_seconds: float = 30.0
+    # Cache of finished LLM analyses (invalidated when ollama_model changes)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_hours: int = 168
+    llm_cache_mb: int = 64
 
     embedding_model: str = "all-MiniLM-L6-v2"
     spacy_model: str = "en_core_web_sm"
+    # "ner" loads only what entity extraction reads; "full" loads every component
+    spacy_profile: Literal["ner", "full"] = "ner"
+    spacy_batch_size: int = 32
+    # Processes per nlp.pipe call; keep 1 when PARSER_WORKERS already fans out
+    spacy_n_process: int = 1
+    # Child processes for CPU-bound parsing; 0 runs parsing in a thread instead
+    parser_workers: int = 2
+    # Local directory for persisted caches (skill embeddings, ...)
+    cache_dir: str = "cache"
+    # Dashboard stats, cached once for all workers
+    stats_cache_ttl_seconds: float = 60.0
+    # Per-process in-memory embedding cache, plus an optional shared disk tier
+    embedding_cache_mb: int = 128
+    embedding_cache_persist: bool = True
+    embedding_cache_disk_mb: int = 1024
 
     max_upload_size_mb: int = 10
+    # Stop PDF extraction after this many pages (0 = no limit)
+    pdf_max_pages: int = 200
+    # PDFs with at least this many pages are extracted in page ranges across
+    # the parsing pool; smaller ones stay on the single-task path
+    pdf_parallel_min_pages: int = 24
     allowed_extensions: list[str] = [".pdf", ".docx"]
+    # How often a worker reconciles its in-memory resume index with the DB
+    search_index_sync_seconds: int = 300
+    # "exact" brute-force scan, or "ivf" approximate search for large corpora
+    vector_index_backend: Literal["exact", "ivf"] = "exact"
+    vector_index_nlist: int = 0  # 0 = about 4 * sqrt(n) clusters
+    vector_index_nprobe: int = 8
+
+    batch_upload_max_files: int = 200
+    # Documents per NER/embedding task in a batch upload
+    batch_parse_chunk_size: int = 32
+
+    # Background jobs (/resume/jobs): concurrent jobs per process, how often
+    # idle workers check the shared queue, and how long finished jobs are kept.
+    # A running job whose lease is not renewed in time is handed to another worker.
+    job_workers: int = 2
+    job_poll_seconds: float = 1.0
+    job_retention_hours: int = 24
+    job_lease_seconds: float = 60.0
 
     cors_origins: List[str] = ["http://localhost:3000"]
 
@@ -0,0 +1,19 @@
+"""Helpers for the small on-disk SQLite stores used as local caches."""
+
+import sqlite3
+from pathlib import Path
+
+
+def open_sqlite(path: str | Path) -> sqlite3.Connection:
+    """Open (creating if needed) a SQLite file shared by several processes.
+
+    WAL mode lets readers in other workers proceed while one process writes,
+    and the busy timeout makes concurrent writers wait instead of failing.
+    Callers must serialise use of the connection across their own threads.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
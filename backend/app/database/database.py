@@ -1,4 +1,7 @@
 # db.py
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from supabase import create_client
 
 from app.core.config import settings
@@ -6,11 +9,55 @@ from app.core.config import settings
 # ------------------------
 # Supabase setup
 # ------------------------
+# The sync client is kept for Storage uploads and offline scripts
 supabase = create_client(settings.supabase_url, settings.supabase_key.get_secret_value())
 
 
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """Async PostgREST client whose HTTP pool limits come from settings."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.db_max_connections,
+                max_keepalive_connections=settings.db_max_keepalive_connections,
+            ),
+        )
+
+
+# One client per worker: every request shares its connection pool
+_async_db: PooledPostgrestClient | None = None
+
+
+def get_async_db() -> PooledPostgrestClient:
+    """The worker's async table client, created on first use."""
+    global _async_db
+    if _async_db is None:
+        key = settings.supabase_key.get_secret_value()
+        _async_db = PooledPostgrestClient(
+            f"{settings.supabase_url}/rest/v1",
+            headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, "apikey": key, "Authorization": f"Bearer {key}"},
+            timeout=settings.db_timeout,
+        )
+    return _async_db
+
+
+async def close_async_db() -> None:
+    global _async_db
+    if _async_db is not None:
+        await _async_db.aclose()
+        _async_db = None
+
+
 # ------------------------
 # FastAPI dependency
 # ------------------------
 async def get_db():
-    yield supabase
+    yield get_async_db()
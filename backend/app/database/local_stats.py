@@ -0,0 +1,37 @@
+"""Offline stand-in for the ``match_stats`` database view.
+
+Loads the view from its migration into an in-memory SQLite database with the
+columns it reads, so the aggregation can be exercised without Supabase (in
+tests, or to sanity-check an edit to the migration).
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+
+MIGRATION = Path(__file__).resolve().parents[2] / "migrations" / "005_match_stats_view.sql"
+
+_VIEW_RE = re.compile(r"create or replace view match_stats as\s+(select\b.*?);", re.IGNORECASE | re.DOTALL)
+
+
+def view_query(path: str | Path = MIGRATION) -> str:
+    """The ``select`` that defines the view."""
+    match = _VIEW_RE.search(Path(path).read_text())
+    if match is None:
+        raise ValueError(f"No match_stats view in {path}")
+    return match.group(1)
+
+
+def local_match_stats(match_scores: list[float | None], total_resumes: int) -> dict:
+    """What the view returns for the given match scores and resume count."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("create table resumes (id integer primary key)")
+        conn.execute("create table matches (id integer primary key, match_score real)")
+        conn.executemany("insert into resumes (id) values (?)", [(i,) for i in range(total_resumes)])
+        conn.executemany("insert into matches (match_score) values (?)", [(s,) for s in match_scores])
+        conn.execute(f"create view match_stats as {view_query()}")
+        conn.row_factory = sqlite3.Row
+        return dict(conn.execute("select * from match_stats").fetchone())
+    finally:
+        conn.close()
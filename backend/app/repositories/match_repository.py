@@ -1,43 +1,132 @@
-from supabase import Client
+import asyncio
+
+from postgrest import AsyncPostgrestClient
 from app.core.exceptions import AppException
 
 class MatchRepository:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncPostgrestClient):
         self.db = db
 
-    def create_job(self, data: dict):
-        response = self.db.table("job_descriptions").insert(data).execute()
+    async def create_job(self, data: dict):
+        response = await self.db.table("job_descriptions").insert(data).execute()
         if not response.data:
             raise AppException(status_code=500, message="Failed to save job description")
         return response.data[0]
 
-    def create_match(self, data: dict):
-        response = self.db.table("matches").insert(data).execute()
+    async def get_jobs(self, job_ids: list[int]) -> list[dict]:
+        """Fetch job descriptions by id (order not guaranteed)."""
+        if not job_ids:
+            return []
+        response = await (
+            self.db.table("job_descriptions")
+            .select("id, description, skills, created_at")
+            .in_("id", job_ids)
+            .execute()
+        )
+        return response.data or []
+
+    async def list_job_embedding_ids(self, embedding_model: str, page_size: int = 1000) -> list[int]:
+        """Ids of all job descriptions whose vectors were made with ``embedding_model``."""
+        ids: list[int] = []
+        while True:
+            response = await (
+                self.db.table("job_descriptions")
+                .select("id")
+                .eq("embedding_model", embedding_model)
+                .order("id")
+                .range(len(ids), len(ids) + page_size - 1)
+                .execute()
+            )
+            page = response.data or []
+            ids.extend(row["id"] for row in page)
+            if len(page) < page_size:
+                return ids
+
+    async def get_jobs_missing_embeddings(self, embedding_model: str, limit: int) -> list[dict]:
+        """Job descriptions with no vector, or one made by another model."""
+        response = await (
+            self.db.table("job_descriptions")
+            .select("id, description")
+            .or_(f'embedding_model.is.null,embedding_model.neq."{embedding_model}"')
+            .order("id")
+            .limit(limit)
+            .execute()
+        )
+        return response.data or []
+
+    async def update_job(self, job_id: int, data: dict):
+        response = await self.db.table("job_descriptions").update(data).eq("id", job_id).execute()
+        if not response.data:
+            raise AppException(status_code=500, message="Failed to update job description")
+        return response.data[0]
+
+    async def get_job_embeddings(self, job_ids: list[int], chunk_size: int = 500):
+        """Yield ``{"id", "embeddings"}`` job rows, fetched in chunks."""
+        for i in range(0, len(job_ids), chunk_size):
+            response = await (
+                self.db.table("job_descriptions")
+                .select("id, embeddings")
+                .in_("id", job_ids[i : i + chunk_size])
+                .execute()
+            )
+            for row in response.data or []:
+                yield row
+
+    async def create_match(self, data: dict):
+        response = await self.db.table("matches").insert(data).execute()
         if not response.data:
             raise AppException(status_code=500, message="Failed to save match")
         return response.data[0]
 
-    def get_all_matches(self):
-        # Fetch matches
-        match_resp = self.db.table("matches").select("*").execute()
-        if not match_resp.data:
+    async def get_matches_page(
+        self,
+        limit: int,
+        after: tuple[str, int] | None = None,
+        resume_id: int | None = None,
+        min_score: float | None = None,
+        max_score: float | None = None,
+    ) -> list[dict]:
+        """
+        One page of match history, newest first.
+
+        Keyset pagination on ``(created_at, id)``: ``after`` is the last row
+        of the previous page, so each page is an index range scan instead of
+        an ever-growing offset. Only the columns the list view shows are
+        fetched from each table.
+        """
+        query = self.db.table("matches").select(
+            "id, jd_id, resume_id, match_score, missing_skills, created_at"
+        )
+        if resume_id is not None:
+            query = query.eq("resume_id", resume_id)
+        if min_score is not None:
+            query = query.gte("match_score", min_score)
+        if max_score is not None:
+            query = query.lte("match_score", max_score)
+        if after is not None:
+            created_at, match_id = after
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{match_id})'
+            )
+        match_resp = await (
+            query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        )
+        matches = match_resp.data or []
+        if not matches:
             return []
-        
-        matches = match_resp.data
-        
+
         # Fetch related jobs and resumes efficiently
         job_ids = list({m.get("jd_id") for m in matches if m.get("jd_id")})
         resume_ids = list({m.get("resume_id") for m in matches if m.get("resume_id")})
 
-        jobs_dict = {}
-        if job_ids:
-            jobs_resp = self.db.table("job_descriptions").select("*").in_("id", job_ids).execute()
-            jobs_dict = {j["id"]: j for j in jobs_resp.data or []}
-
-        resumes_dict = {}
-        if resume_ids:
-            resumes_resp = self.db.table("resumes").select("*").in_("id", resume_ids).execute()
-            resumes_dict = {r["id"]: r for r in resumes_resp.data or []}
+        # The jobs and resumes lookups are independent, so run them together
+        jobs, resumes = await asyncio.gather(
+            self._select_in("job_descriptions", "id, description, skills", job_ids),
+            self._select_in("resumes", "id, filename", resume_ids),
+        )
+        jobs_dict = {j["id"]: j for j in jobs}
+        resumes_dict = {r["id"]: r for r in resumes}
 
         results = []
         for m in matches:
@@ -55,55 +144,45 @@ class MatchRepository:
             
         return results
 
-    def delete_match(self, match_id: int):
-        response = self.db.table("matches").delete().eq("id", match_id).execute()
+    async def delete_match(self, match_id: int):
+        response = await self.db.table("matches").delete().eq("id", match_id).execute()
         return response.data
 
-    def get_match_by_id(self, match_id: int):
-        response = self.db.table("matches").select("id").eq("id", match_id).execute()
+    async def get_match_by_id(self, match_id: int):
+        response = await self.db.table("matches").select("id").eq("id", match_id).execute()
         if not response.data:
             return None
         return response.data[0]
 
-    def get_stats(self):
-        match_res = self.db.table("matches").select("match_score", count="exact").execute()
-        total_matches = match_res.count if match_res.count is not None else len(match_res.data)
-        
-        avg_score = 0.0
-        success_rate = 0.0
-        
-        if match_res.data and total_matches > 0:
-            scores = [m["match_score"] for m in match_res.data if m.get("match_score") is not None]
-            if scores:
-                avg_score = float(f"{sum(scores) / len(scores):.1f}")
-                success_count = sum(1 for s in scores if s >= 70)
-                success_rate = float(f"{(success_count / len(scores)) * 100:.1f}")
-                
+    async def get_stats(self) -> dict:
+        """Dashboard totals, aggregated by the ``match_stats`` view in one round trip."""
+        response = await (
+            self.db.table("match_stats")
+            .select("total_resumes, total_matches, avg_score, success_rate")
+            .execute()
+        )
+        row = response.data[0] if response.data else {}
         return {
-            "total_matches": total_matches,
-            "avg_score": avg_score,
-            "success_rate": success_rate
+            "total_resumes": int(row.get("total_resumes") or 0),
+            "total_matches": int(row.get("total_matches") or 0),
+            "avg_score": float(row.get("avg_score") or 0),
+            "success_rate": float(row.get("success_rate") or 0),
         }
 
-    def get_match_detail(self, match_id: int):
+    async def get_match_detail(self, match_id: int):
         """Fetch a single match with its job description and resume data."""
-        match_resp = self.db.table("matches").select("*").eq("id", match_id).execute()
+        match_resp = await self.db.table("matches").select("*").eq("id", match_id).execute()
         if not match_resp.data:
             return None
 
         m = match_resp.data[0]
 
-        job = None
-        if m.get("jd_id"):
-            jd_resp = self.db.table("job_descriptions").select("*").eq("id", m["jd_id"]).execute()
-            if jd_resp.data:
-                job = jd_resp.data[0]
-
-        resume = None
-        if m.get("resume_id"):
-            res_resp = self.db.table("resumes").select("id,filename,skills").eq("id", m["resume_id"]).execute()
-            if res_resp.data:
-                resume = res_resp.data[0]
+        jobs, resumes = await asyncio.gather(
+            self._select_in("job_descriptions", "*", [m["jd_id"]] if m.get("jd_id") else []),
+            self._select_in("resumes", "id,filename,skills", [m["resume_id"]] if m.get("resume_id") else []),
+        )
+        job = jobs[0] if jobs else None
+        resume = resumes[0] if resumes else None
 
         return {
             "id": m["id"],
@@ -116,3 +195,8 @@ class MatchRepository:
             "created_at": m.get("created_at"),
         }
 
+    async def _select_in(self, table: str, columns: str, ids: list[int]) -> list[dict]:
+        if not ids:
+            return []
+        response = await self.db.table(table).select(columns).in_("id", ids).execute()
+        return response.data or []
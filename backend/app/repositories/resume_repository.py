@@ -1,21 +1,31 @@
-from supabase import Client
+from postgrest import AsyncPostgrestClient
 from app.core.exceptions import AppException
 
 class ResumeRepository:
-    def __init__(self, db: Client):
+    def __init__(self, db: AsyncPostgrestClient):
         self.db = db
 
-    def create(self, data: dict):
-        response = self.db.table("resumes").insert(data).execute()
+    async def create(self, data: dict):
+        response = await self.db.table("resumes").insert(data).execute()
         if not response.data:
             raise AppException(status_code=500, message="Failed to save resume", details="Empty response from DB")
         return response.data[0]
 
-    def get_by_id(self, resume_id: int):
-        # Exclude embeddings — they're large float arrays not needed for matching/analysis
-        response = (
+    async def create_many(self, rows: list[dict]):
+        """Bulk insert; returns the created rows in input order."""
+        response = await self.db.table("resumes").insert(rows).execute()
+        if not response.data or len(response.data) != len(rows):
+            raise AppException(status_code=500, message="Failed to save resumes", details="Bulk insert returned no rows")
+        return response.data
+
+    async def get_by_id(self, resume_id: int, include_embeddings: bool = False):
+        # Embeddings are large float arrays; only the match path asks for them
+        columns = "id, filename, text, skills, education, experience, created_at"
+        if include_embeddings:
+            columns += ", embeddings, skill_embeddings, embedding_model"
+        response = await (
             self.db.table("resumes")
-            .select("id, filename, text, skills, education, experience, created_at")
+            .select(columns)
             .eq("id", resume_id)
             .limit(1)
             .execute()
@@ -24,15 +34,78 @@ class ResumeRepository:
             return None
         return response.data[0]
 
-    def get_all(self, limit: int, offset: int):
-        response = self.db.table("resumes").select("id, filename, skills, education, experience, created_at").range(offset, offset + limit - 1).execute()
+    async def get_by_file_hash(self, file_hash: str):
+        response = await (
+            self.db.table("resumes")
+            .select("id, filename, text, skills, education, experience, file_url, created_at")
+            .eq("file_hash", file_hash)
+            .order("id")
+            .limit(1)
+            .execute()
+        )
+        if not response.data:
+            return None
+        return response.data[0]
+
+    async def get_by_file_hashes(self, file_hashes: list[str]) -> dict:
+        """Map each already stored file hash to its resume ``{"id", "file_hash"}``."""
+        if not file_hashes:
+            return {}
+        response = await self.db.table("resumes").select("id, file_hash").in_("file_hash", file_hashes).execute()
+        return {row["file_hash"]: row for row in response.data or []}
+
+    async def get_many(self, resume_ids: list[int]):
+        """Rows needed to score resumes against a JD, including stored vectors."""
+        if not resume_ids:
+            return []
+        response = await (
+            self.db.table("resumes")
+            .select("id, filename, text, skills, embeddings, skill_embeddings, embedding_model")
+            .in_("id", resume_ids)
+            .execute()
+        )
+        return response.data or []
+
+    async def list_embedding_ids(self, embedding_model: str, page_size: int = 1000) -> list[int]:
+        """Ids of all resumes whose stored vectors were made with ``embedding_model``."""
+        ids: list[int] = []
+        while True:
+            response = await (
+                self.db.table("resumes")
+                .select("id")
+                .eq("embedding_model", embedding_model)
+                .order("id")
+                .range(len(ids), len(ids) + page_size - 1)
+                .execute()
+            )
+            page = response.data or []
+            ids.extend(row["id"] for row in page)
+            if len(page) < page_size:
+                return ids
+
+    async def get_embeddings(self, resume_ids: list[int], chunk_size: int = 500):
+        """Yield ``{"id", "embeddings"}`` rows, fetched in chunks."""
+        for i in range(0, len(resume_ids), chunk_size):
+            response = await (
+                self.db.table("resumes")
+                .select("id, embeddings")
+                .in_("id", resume_ids[i : i + chunk_size])
+                .execute()
+            )
+            for row in response.data or []:
+                yield row
+
+    async def update(self, resume_id: int, data: dict):
+        response = await self.db.table("resumes").update(data).eq("id", resume_id).execute()
+        if not response.data:
+            raise AppException(status_code=500, message="Failed to update resume", details="Empty response from DB")
+        return response.data[0]
+
+    async def get_all(self, limit: int, offset: int):
+        response = await self.db.table("resumes").select("id, filename, skills, education, experience, created_at").range(offset, offset + limit - 1).execute()
         return response.data or []
 
-    def delete(self, resume_id: int):
-        self.db.table("matches").delete().eq("resume_id", resume_id).execute()
-        response = self.db.table("resumes").delete().eq("id", resume_id).execute()
+    async def delete(self, resume_id: int):
+        await self.db.table("matches").delete().eq("resume_id", resume_id).execute()
+        response = await self.db.table("resumes").delete().eq("id", resume_id).execute()
         return response.data
-
-    def count(self):
-        response = self.db.table("resumes").select("id", count="exact").execute()
-        return response.count if response.count is not None else len(response.data)
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.core.auth import get_api_key
+from app.core.exceptions import AppException
+from app.core.rate_limit import limiter
+from app.schemas.resume import AnalyzeRequest, JobStatusResponse
+from app.services.jobs import job_runner
+from app.services.resume_service import validate_upload
+
+router = APIRouter(dependencies=[Depends(get_api_key)])
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+
+def _get_job(job_id: str) -> dict:
+    job = job_runner.store.get(job_id)
+    if not job:
+        raise AppException(status_code=404, message="Job not found")
+    return job
+
+
+@router.post("/jobs/upload", response_model=JobStatusResponse, status_code=202)
+@limiter.limit("5/minute")
+async def submit_upload_job(
+    request: Request,
+    file: UploadFile = File(...),
+    force_reparse: bool = Query(default=False, description="Re-parse even if this exact file was uploaded before"),
+):
+    """Queue a resume upload; returns the job to poll at once."""
+    file_bytes = await file.read()
+    # Reject obviously bad files now rather than as a failed job later
+    safe_filename = validate_upload(file.filename, file.content_type, file_bytes)
+    params = {"filename": safe_filename, "content_type": file.content_type, "force_reparse": force_reparse}
+    return await job_runner.submit("upload", params, file_bytes)
+
+
+@router.post("/jobs/analyze", response_model=JobStatusResponse, status_code=202)
+@limiter.limit("10/minute")
+async def submit_analysis_job(
+    request: Request,
+    body: AnalyzeRequest,
+    refresh: bool = Query(default=False, description="Ignore any cached analysis and regenerate"),
+):
+    """Queue an LLM analysis; returns the job to poll at once."""
+    params = {"resume_id": body.resume_id, "job_description": body.job_description, "refresh": refresh}
+    return await job_runner.submit("analyze", params)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+@limiter.limit("120/minute")
+async def get_job(request: Request, job_id: str):
+    """Current status, stage and progress of a job (and its result once done)."""
+    return await asyncio.to_thread(_get_job, job_id)
+
+
+@router.get("/jobs/{job_id}/events")
+@limiter.limit("20/minute")
+async def job_events(request: Request, job_id: str):
+    """Server-Sent Events: ``progress`` on every stage change, then ``done``."""
+    job = await asyncio.to_thread(_get_job, job_id)
+
+    async def event_source():
+        current, last = job, None
+        while True:
+            state = (current["status"], current["stage"])
+            if current["status"] in TERMINAL_STATUSES:
+                payload = JobStatusResponse.model_validate(current).model_dump()
+                yield f"event: done\ndata: {json.dumps(payload)}\n\n"
+                return
+            if state != last:
+                payload = {k: current[k] for k in ("id", "status", "stage", "progress")}
+                yield f"event: progress\ndata: {json.dumps(payload)}\n\n"
+                last = state
+            await asyncio.sleep(0.5)
+            current = await asyncio.to_thread(_get_job, job_id)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,19 @@
-import httpx
+import json
 import logging
 
-from app.schemas.resume import JobMatchResponse, ResumeParseResponse, AnalysisResponse, MatchRequest, AnalyzeRequest
+from app.schemas.resume import JobMatchResponse, ResumeParseResponse, AnalysisResponse, MatchRequest, AnalyzeRequest, SearchRequest, SearchResponse, JobRankResponse, MatchListItem
 
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, Response, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from app.database.database import get_db
 from app.repositories.match_repository import MatchRepository
 from app.repositories.resume_repository import ResumeRepository
 from app.services.match_service import MatchService
+from app.services.llm import llm_scheduler
+from app.services.ollama_client import ollama_client
 from app.core.rate_limit import limiter
 from app.core.auth import get_api_key
-from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -37,13 +40,50 @@ async def match_resume_to_job(
         missing_skills=match_data["missing_skills"],
     )
 
-@router.get("/matches")
+@router.post("/search", response_model=SearchResponse)
+@limiter.limit("10/minute")
+async def search_resumes(
+    request: Request,
+    body: SearchRequest,
+    service: MatchService = Depends(get_service)
+):
+    """Return the top-k stored resumes for a job description."""
+    return await service.search_resumes(body.job_description, body.top_k)
+
+@router.get("/resume/{resume_id}/jobs", response_model=JobRankResponse)
+@limiter.limit("10/minute")
+async def rank_jobs_for_resume(
+    request: Request,
+    resume_id: int,
+    top_n: int = Query(default=10, ge=1, le=100),
+    service: MatchService = Depends(get_service)
+):
+    """Return the stored job descriptions that best fit a resume."""
+    return await service.rank_jobs_for_resume(resume_id, top_n)
+
+@router.get("/matches", response_model=list[MatchListItem])
 @limiter.limit("50/minute")
 async def list_matches(
     request: Request,
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor from the previous page"),
+    resume_id: int | None = Query(default=None, description="Only matches for this resume"),
+    min_score: float | None = Query(default=None, ge=0, le=100),
+    max_score: float | None = Query(default=None, ge=0, le=100),
     service: MatchService = Depends(get_service)
 ):
-    return service.list_matches()
+    """Match history, newest first.
+
+    Pages are keyset-paginated: when more matches exist, the ``X-Next-Cursor``
+    response header holds the cursor for the next page.
+    """
+    matches, next_cursor = await service.list_matches(
+        limit, cursor, resume_id=resume_id, min_score=min_score, max_score=max_score
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return matches
 
 @router.get("/match/{match_id}")
 @limiter.limit("30/minute")
@@ -53,7 +93,7 @@ async def get_match(
     service: MatchService = Depends(get_service)
 ):
     """Retrieve a single match by ID for the detail view."""
-    match = service.match_repo.get_match_detail(match_id)
+    match = await service.match_repo.get_match_detail(match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
     return match
@@ -65,7 +105,7 @@ async def delete_match(
     match_id: int,
     service: MatchService = Depends(get_service)
 ):
-    service.delete_match(match_id)
+    await service.delete_match(match_id)
     return {"message": "Match deleted successfully"}
 
 @router.get("/stats")
@@ -74,39 +114,70 @@ async def get_stats(
     request: Request,
     service: MatchService = Depends(get_service)
 ):
-    return service.get_stats()
+    return await service.get_stats()
 
 @router.post("/analyze")
 @limiter.limit("5/minute")
 async def analyze_resume_endpoint(
     request: Request,
     body: AnalyzeRequest,
+    refresh: bool = Query(default=False, description="Ignore any cached analysis and regenerate"),
     service: MatchService = Depends(get_service)
 ):
     """Analyze a resume using the local LLM, optionally compared against a job description."""
-    return await service.analyze_resume(body.resume_id, body.job_description)
+    return await service.analyze_resume(body.resume_id, body.job_description, refresh=refresh)
+
+
+@router.post("/analyze/stream")
+@limiter.limit("5/minute")
+async def analyze_resume_stream(
+    request: Request,
+    body: AnalyzeRequest,
+    refresh: bool = Query(default=False, description="Ignore any cached analysis and regenerate"),
+    service: MatchService = Depends(get_service)
+):
+    """Stream an LLM analysis as Server-Sent Events.
+
+    Emits ``queued`` events (position, estimated wait) while waiting for a
+    generation slot, ``token`` events with raw generated text, a ``field``
+    event as each top-level field of the analysis completes, and a final
+    ``result`` event carrying the validated ``AnalysisResponse``.
+    """
+    events = await service.stream_analysis(body.resume_id, body.job_description, refresh=refresh)
+
+    async def event_source():
+        async for event, data in events:
+            if event == "result":
+                try:
+                    data = AnalysisResponse.model_validate(data).model_dump()
+                except ValidationError as e:
+                    logger.error(f"Streamed analysis failed validation: {e}")
+                    data = AnalysisResponse(
+                        summary="Could not parse AI analysis. The model may have returned malformed output.",
+                        score=0,
+                        error="Model output did not match the expected format",
+                    ).model_dump()
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/llm/queue")
+@limiter.limit("60/minute")
+async def llm_queue_status(request: Request):
+    """Current LLM queue depth and the estimated wait for a new analysis."""
+    return llm_scheduler.stats()
 
 
 @router.get("/ollama/status")
 @limiter.limit("20/minute")
 async def ollama_status(request: Request):
-    """Check if the Ollama LLM service is reachable."""
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.ollama_base_url}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
-                models = [m.get("name", "") for m in data.get("models", [])]
-                return {
-                    "status": "online",
-                    "model": settings.ollama_model,
-                    "available_models": models,
-                }
-    except (httpx.ConnectError, httpx.TimeoutException) as e:
-        logger.info(f"Ollama is offline: {e}")
-
-    return {
-        "status": "offline",
-        "model": settings.ollama_model,
-        "available_models": [],
-    }
+    """Ollama health as last seen by the circuit breaker and background probe.
+
+    Answers from memory, so polling this never adds load to Ollama.
+    """
+    return ollama_client.status()
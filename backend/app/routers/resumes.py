@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, File, UploadFile, Request, Query
 from app.database.database import get_db
 from app.repositories.resume_repository import ResumeRepository
 from app.services.resume_service import ResumeService
-from app.schemas.resume import ResumeParseResponse
+from app.schemas.resume import BatchUploadResponse, ResumeParseResponse
 from app.core.rate_limit import limiter
 from app.core.auth import get_api_key
 
@@ -18,9 +18,19 @@ def get_service(db=Depends(get_db)) -> ResumeService:
 async def upload_resume(
     request: Request, 
     file: UploadFile = File(...), 
+    force_reparse: bool = Query(default=False, description="Re-parse even if this exact file was uploaded before"),
     service: ResumeService = Depends(get_service)
 ):
-    return await service.process_upload(file)
+    return await service.process_upload(file, force_reparse=force_reparse)
+
+@router.post("/upload/batch", response_model=BatchUploadResponse)
+@limiter.limit("2/minute")
+async def upload_resume_batch(
+    request: Request,
+    files: list[UploadFile] = File(..., description="PDF/DOCX files, or zip archives of them"),
+    service: ResumeService = Depends(get_service)
+):
+    return await service.process_batch(files)
 
 @router.get("/resume/{resume_id}", response_model=ResumeParseResponse)
 @limiter.limit("30/minute")
@@ -29,7 +39,7 @@ async def get_resume(
     resume_id: int, 
     service: ResumeService = Depends(get_service)
 ):
-    return service.get_resume(resume_id)
+    return await service.get_resume(resume_id)
 
 @router.get("/resumes")
 @limiter.limit("50/minute")
@@ -39,7 +49,7 @@ async def list_resumes(
     offset: int = Query(default=0, ge=0),
     service: ResumeService = Depends(get_service)
 ):
-    return service.list_resumes(limit, offset)
+    return await service.list_resumes(limit, offset)
 
 @router.delete("/resume/{resume_id}")
 @limiter.limit("10/minute")
@@ -48,5 +58,5 @@ async def delete_resume(
     resume_id: int, 
     service: ResumeService = Depends(get_service)
 ):
-    service.delete_resume(resume_id)
+    await service.delete_resume(resume_id)
     return {"message": "Resume deleted successfully"}
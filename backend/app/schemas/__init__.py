@@ -1,17 +1,29 @@
 """Pydantic schemas for request/response validation."""
 
 from .resume import (
+    BatchUploadItem,
+    BatchUploadResponse,
     JobDescriptionRequest,
     JobMatchResponse,
+    JobRankResponse,
+    JobStatusResponse,
     MatchListItem,
     ResumeListItem,
     ResumeParseResponse,
+    SearchRequest,
+    SearchResponse,
 )
 
 __all__ = [
+    "BatchUploadItem",
+    "BatchUploadResponse",
     "ResumeParseResponse",
     "ResumeListItem",
     "JobDescriptionRequest",
     "JobMatchResponse",
+    "JobRankResponse",
+    "JobStatusResponse",
     "MatchListItem",
+    "SearchRequest",
+    "SearchResponse",
 ]
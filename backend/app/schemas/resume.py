@@ -1,6 +1,7 @@
 
 
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -13,11 +14,30 @@ class ResumeParseResponse(BaseModel):
     skills: list[str] = Field(default_factory=list)
     education: list[str] = Field(default_factory=list)
     experience: list[str] = Field(default_factory=list)
+    # True when an identical file was already parsed and its result is returned
+    duplicate: bool = False
 
     class Config:
         from_attributes = True
 
 
+class BatchUploadItem(BaseModel):
+
+    filename: str
+    status: Literal["created", "duplicate", "error"]
+    id: int | None = None
+    error: str | None = None
+
+
+class BatchUploadResponse(BaseModel):
+
+    total: int
+    created: int
+    duplicates: int
+    failed: int
+    items: list[BatchUploadItem] = Field(default_factory=list)
+
+
 class ResumeListItem(BaseModel):
 
     id: int
@@ -77,6 +97,7 @@ class AnalysisResponse(BaseModel):
     score: int
     match_percentage: int | None = None
     error: str | None = None
+    cached: bool = False
 
 
 class AnalyzeRequest(BaseModel):
@@ -98,6 +119,46 @@ class AnalyzeRequest(BaseModel):
             return None
         return v
 
+class SearchRequest(BaseModel):
+    job_description: str = Field(..., min_length=10, max_length=10000)
+    top_k: int = Field(default=10, ge=1, le=100)
+
+    @field_validator("job_description")
+    @classmethod
+    def validate_description(cls, v: str) -> str:
+        if not v.strip():
+            raise ValueError("Job description cannot be empty or whitespace")
+        return v.strip()
+
+
+class SearchResult(BaseModel):
+    resume_id: int
+    filename: str | None = None
+    score: float
+    missing_skills: list[str] = Field(default_factory=list)
+
+
+class SearchResponse(BaseModel):
+    jd_skills: list[str] = Field(default_factory=list)
+    results: list[SearchResult] = Field(default_factory=list)
+
+
+class JobRankResult(BaseModel):
+    jd_id: int
+    jd_text: str
+    score: float
+    similarity: float
+    skill_coverage: float
+    matched_skills: list[str] = Field(default_factory=list)
+    missing_skills: list[str] = Field(default_factory=list)
+    created_at: datetime | None = None
+
+
+class JobRankResponse(BaseModel):
+    resume_id: int
+    results: list[JobRankResult] = Field(default_factory=list)
+
+
 class MatchRequest(BaseModel):
     resume_id: int
     job_description: str = Field(..., min_length=10, max_length=10000)
@@ -108,3 +169,15 @@ class MatchRequest(BaseModel):
         if not v.strip():
             raise ValueError("Job description cannot be empty or whitespace")
         return v.strip()
+
+
+class JobStatusResponse(BaseModel):
+    id: str
+    kind: Literal["upload", "analyze"]
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: str | None = None
+    progress: float = 0.0
+    result: dict | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
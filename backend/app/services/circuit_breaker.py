@@ -0,0 +1,140 @@
+"""Circuit breaker for calls to an unreliable dependency (Ollama).
+
+The breaker watches the outcome and latency of recent calls. Once enough of
+them fail (errors, 5xx, or calls slower than ``slow_call_seconds``) it
+opens, and callers fail fast instead of each waiting out a long timeout.
+After a cool-down it goes half-open and lets exactly one trial call
+through. The trial is usually a background probe, but a real request can
+also serve. A successful trial closes the breaker. A failed one reopens
+it, and the cool-down doubles up to ``max_open_seconds``.
+"""
+
+import time
+from collections import deque
+
+from app.core.exceptions import AppException
+
+
+class CircuitOpenError(AppException):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(
+            message=f"{name} is temporarily unavailable; retry in {retry_in:.0f}s",
+            status_code=503,
+            details={"retry_in_seconds": round(retry_in, 1)},
+        )
+
+
+class CircuitBreaker:
+    """Failure-rate breaker over a sliding window of recent calls."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 4,
+        window: int = 20,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+        slow_call_seconds: float = 90.0,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.slow_call_seconds = slow_call_seconds
+
+        self._calls: deque[tuple[bool, float]] = deque(maxlen=window)
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._cooldown = open_seconds
+        self._trial_in_flight = False
+        self.last_error: str | None = None
+        self.last_success_at: float | None = None
+        self.last_call_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._state == "open" and self.retry_in() == 0:
+            self._state = "half_open"
+        return self._state
+
+    def retry_in(self) -> float:
+        if self._state != "open":
+            return 0.0
+        return max(0.0, self._opened_at + self._cooldown - time.monotonic())
+
+    def before_call(self) -> None:
+        """Admit a call, or raise ``CircuitOpenError`` to fail fast."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        raise CircuitOpenError(self.name, self.retry_in() or self._cooldown)
+
+    def cancel_call(self) -> None:
+        """The admitted call ended without an outcome (e.g. the client left)."""
+        self._trial_in_flight = False
+
+    def observe(self, ok: bool, error: str | None = None) -> None:
+        """Note an outcome for status reporting only, outside the window.
+
+        For calls that shouldn't decide whether the breaker opens, such as
+        health probes while it is closed.
+        """
+        now = time.monotonic()
+        self.last_call_at = now
+        if ok:
+            self.last_success_at = now
+        else:
+            self.last_error = error
+
+    def record(self, ok: bool, latency: float, error: str | None = None) -> None:
+        if ok and latency > self.slow_call_seconds:
+            ok, error = False, f"slow response ({latency:.0f}s)"
+        self._calls.append((ok, latency))
+        self.observe(ok, error)
+
+        if self._state == "half_open":
+            self._trial_in_flight = False
+            if ok:
+                self._close()
+            else:
+                self._open(min(self._cooldown * 2, self.max_open_seconds))
+        elif self._state == "closed" and self._should_open():
+            self._open(self.open_seconds)
+
+    def snapshot(self) -> dict:
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        latencies = [latency for _, latency in self._calls]
+        return {
+            "state": self.state,
+            "recent_calls": len(self._calls),
+            "failure_rate": round(failures / len(self._calls), 2) if self._calls else 0.0,
+            "avg_latency_seconds": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "retry_in_seconds": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+            "seconds_since_success": (
+                round(time.monotonic() - self.last_success_at, 1) if self.last_success_at else None
+            ),
+        }
+
+    def _should_open(self) -> bool:
+        if len(self._calls) < self.min_calls:
+            return False
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        return failures / len(self._calls) >= self.failure_rate
+
+    def _open(self, cooldown: float) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._cooldown = cooldown
+
+    def _close(self) -> None:
+        self._state = "closed"
+        self._cooldown = self.open_seconds
+        self._calls.clear()
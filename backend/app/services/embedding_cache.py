@@ -0,0 +1,169 @@
+"""Content-addressed cache in front of the sentence embedding model.
+
+Entries are keyed by ``sha256(model, text)`` and held in an in-memory LRU
+bounded by a byte budget. Optionally every new vector is also written to a
+SQLite file, so the cache survives restarts and is shared by all parser
+processes on the host. Batch lookups only send the misses to the encoder.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from app.core.local_store import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (key, OrderedDict node, array header)
+_ENTRY_OVERHEAD_BYTES = 200
+# Check the disk store against its budget every this many writes
+_DISK_PRUNE_EVERY = 500
+
+
+class EmbeddingCache:
+    """LRU embedding cache with an optional persistent spill store."""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_bytes: int,
+        disk_path: str | Path | None = None,
+        max_disk_bytes: int = 0,
+    ):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        self._db = None
+        if disk_path is not None:
+            self._db = open_sqlite(disk_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
+
+    def encode(
+        self, texts: list[str], encoder: Callable[[list[str]], np.ndarray]
+    ) -> np.ndarray:
+        """Return a ``(len(texts), dim)`` float32 matrix, encoding only misses."""
+        keys = [self._key(t) for t in texts]
+        found: dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                if key not in found and key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                    self.hits += 1
+
+            if self._db is not None:
+                pending = list({k for k in keys if k not in found})
+                for vec_key, vector in self._disk_get(pending):
+                    found[vec_key] = vector
+                    self._remember(vec_key, vector)
+                    self.disk_hits += 1
+
+        # Encode each distinct missing text once, outside the lock
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = np.asarray(encoder(list(missing.values())), dtype=np.float32)
+            new_entries = list(zip(missing.keys(), vectors, strict=True))
+            with self._lock:
+                self.misses += len(new_entries)
+                for key, vector in new_entries:
+                    found[key] = vector
+                    self._remember(key, vector)
+                if self._db is not None:
+                    self._disk_put(new_entries)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[k] for k in keys])
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    # ── In-memory LRU ────────────────────────────────────────────────────────
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = vector
+        self._bytes += vector.nbytes + _ENTRY_OVERHEAD_BYTES
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes + _ENTRY_OVERHEAD_BYTES
+
+    # ── Disk store ───────────────────────────────────────────────────────────
+
+    def _disk_get(self, keys: list[str]) -> list[tuple[str, np.ndarray]]:
+        found = []
+        try:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.extend((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+        return found
+
+    def _disk_put(self, entries: list[tuple[str, np.ndarray]]) -> None:
+        try:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in entries],
+            )
+        except Exception as e:
+            # The disk tier is best-effort; never fail an encode because of it
+            logger.warning(f"Embedding cache write failed: {e}")
+            return
+
+        self._writes_since_prune += len(entries)
+        if self.max_disk_bytes and self._writes_since_prune >= _DISK_PRUNE_EVERY:
+            self._writes_since_prune = 0
+            self._disk_prune(entry_bytes=entries[0][1].nbytes + 100)
+
+    def _disk_prune(self, entry_bytes: int) -> None:
+        # Oldest rows (lowest rowid) go first once over budget
+        max_entries = max(1, self.max_disk_bytes // entry_bytes)
+        try:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE rowid <= "
+                "(SELECT MAX(rowid) FROM embeddings) - ?",
+                (max_entries,),
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache prune failed: {e}")
@@ -0,0 +1,227 @@
+"""Process pool for CPU-bound parsing work.
+
+spaCy NER and SentenceTransformer encoding hold the GIL for seconds per
+document. Running them inside ``async def`` handlers freezes the event loop,
+so every other request on the worker waits behind one heavy PDF. Parse tasks
+are shipped to child processes instead; each child loads the models once.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.services import parser
+
+logger = logging.getLogger(__name__)
+
+
+# ── Worker-side tasks ─────────────────────────────────────────────────────────
+# These run inside the pool, so they must be module-level (picklable) and
+# should do all the heavy lifting for one request in a single round trip.
+
+
+def _init_worker() -> None:
+    parser.load_models()
+
+
+def _noop() -> None:
+    return None
+
+
+def extract_document_text(file_bytes: bytes, ext: str) -> str:
+    """Extract plain text from an uploaded PDF/DOCX, straight from its bytes."""
+    return parser.extract_text(file_bytes, ext)
+
+
+def extract_pdf_range(file_bytes: bytes, start: int, stop: int) -> str:
+    """Extract one page range of a large PDF."""
+    return parser.extract_pdf_pages(file_bytes, start, stop)
+
+
+def analyze_resume_text(text: str) -> dict:
+    """Entities and the document embedding for extracted resume text."""
+    analysis = parser.analyze_document(text)
+    return {
+        "entities": analysis.entities,
+        "embeddings": analysis.embedding.tolist(),
+        "embedding_model": parser.embedding_signature(),
+    }
+
+
+def embed_skills(skills: list) -> list:
+    """Per-skill vectors stored alongside a resume."""
+    return parser.get_skill_embeddings_for(skills)
+
+
+def parse_resume_texts(texts: list[str]) -> list[dict]:
+    """Batched analysis (NER + embeddings) of already extracted resume texts."""
+    analyses = parser.analyze_documents(texts)
+    skill_embeddings = parser.get_skill_embeddings_batch(
+        [analysis.entities.get("skills", []) for analysis in analyses]
+    )
+    signature = parser.embedding_signature()
+    return [
+        {
+            "entities": analysis.entities,
+            "embeddings": analysis.embedding.tolist(),
+            "skill_embeddings": skill_embs,
+            "embedding_model": signature,
+        }
+        for analysis, skill_embs in zip(analyses, skill_embeddings, strict=True)
+    ]
+
+
+def match_job_description(resume: dict, jd_text: str):
+    """Parse a job description and score a resume row against it.
+
+    Reuses the resume's stored vectors when they match the current model. The
+    JD's own embedding is returned too so it can be stored for reverse search.
+    """
+    jd = parser.analyze_document(jd_text)
+    resume_embedding, resume_skill_embeddings = parser.stored_resume_embeddings(resume)
+    match_score, missing = parser.calculate_match(
+        resume_text=resume["text"],
+        resume_skills=resume.get("skills") or [],
+        jd_text=jd_text,
+        jd_skills=jd.entities.get("skills", []),
+        resume_embedding=resume_embedding,
+        resume_skill_embeddings=resume_skill_embeddings,
+        jd_embedding=jd.embedding,
+    )
+    return jd.entities, match_score, missing, jd.embedding.tolist()
+
+
+def resume_query_vector(resume: dict):
+    """The resume's document vector: stored if current, else re-encoded."""
+    embedding, _ = parser.stored_resume_embeddings(resume)
+    if embedding is not None:
+        return embedding
+    return parser.get_embeddings(resume.get("text") or "")
+
+
+def parse_job_description(jd_text: str):
+    """Entities and document embedding for a job description."""
+    jd = parser.analyze_document(jd_text)
+    return jd.entities, jd.embedding.tolist()
+
+
+def missing_skills_for_resumes(
+    resumes: list[dict], jd_text: str, jd_skills: list, jd_embedding: list | None = None
+) -> list:
+    """Missing-skill breakdown of each resume row against one JD."""
+    if jd_embedding is None:
+        jd_embedding = parser.get_embeddings(jd_text)
+    results = []
+    for resume in resumes:
+        resume_embedding, resume_skill_embeddings = parser.stored_resume_embeddings(resume)
+        _, missing = parser.calculate_match(
+            resume_text=resume.get("text") or "",
+            resume_skills=resume.get("skills") or [],
+            jd_text=jd_text,
+            jd_skills=jd_skills,
+            resume_embedding=resume_embedding,
+            resume_skill_embeddings=resume_skill_embeddings,
+            jd_embedding=jd_embedding,
+        )
+        results.append(missing)
+    return results
+
+
+# ── Executor ──────────────────────────────────────────────────────────────────
+
+
+class ParsingExecutor:
+    """Runs parse tasks off the event loop.
+
+    With ``max_workers > 0`` tasks go to a ``spawn``-based process pool whose
+    children warm up the models in their initializer. ``max_workers == 0``
+    falls back to the default thread pool, which keeps everything in-process
+    (useful for tests and tiny deployments).
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self.max_workers <= 0 or self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        # Children are spawned lazily; submit one no-op each so models load now
+        for _ in range(self.max_workers):
+            self._pool.submit(_noop)
+        logger.info(f"Parsing pool started with {self.max_workers} worker(s)")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logger.info("Parsing pool stopped")
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the pool and await its result."""
+        call = partial(fn, *args, **kwargs)
+        if self.max_workers <= 0:
+            return await asyncio.to_thread(call)
+
+        self.start()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        except BrokenProcessPool as e:
+            # A child died (OOM, segfault in a native lib); rebuild on next call
+            logger.error(f"Parsing pool broke, restarting: {e}")
+            self._pool = None
+            raise AppException(
+                status_code=503, message="Document parser unavailable, please retry"
+            ) from e
+
+    def page_ranges(self, file_bytes: bytes, ext: str) -> list[tuple[int, int]]:
+        """
+        Split a large PDF into one ``(start, stop)`` page range per worker.
+
+        Returns an empty list when the document should take the normal
+        single-task path: not a PDF, no process pool to spread over, or
+        fewer pages than ``pdf_parallel_min_pages``.
+        """
+        if ext.lower() != "pdf" or self.max_workers < 2:
+            return []
+        try:
+            pages = parser.pdf_page_count(file_bytes)
+        except Exception:
+            # Let the regular extraction path report the broken file
+            return []
+        if settings.pdf_max_pages:
+            pages = min(pages, settings.pdf_max_pages)
+        if pages < max(settings.pdf_parallel_min_pages, 2):
+            return []
+
+        parts = min(self.max_workers, pages)
+        bounds = [pages * i // parts for i in range(parts + 1)]
+        return list(zip(bounds[:-1], bounds[1:], strict=True))
+
+    async def extract_text(self, file_bytes: bytes, ext: str) -> str:
+        """Extract document text, fanning large PDFs out by page range."""
+        ranges = await asyncio.to_thread(self.page_ranges, file_bytes, ext)
+        if not ranges:
+            return await self.run(extract_document_text, file_bytes, ext)
+        return await self.extract_page_ranges(file_bytes, ranges)
+
+    async def extract_page_ranges(self, file_bytes: bytes, ranges: list[tuple[int, int]]) -> str:
+        """Extract PDF page ranges concurrently and merge them in page order."""
+        # gather keeps submission order, so pages are merged in order
+        parts = await asyncio.gather(
+            *(self.run(extract_pdf_range, file_bytes, start, stop) for start, stop in ranges)
+        )
+        return "".join(parts)
+
+
+parsing_executor = ParsingExecutor(settings.parser_workers)
@@ -0,0 +1,136 @@
+"""Durable job records for background uploads and analyses.
+
+Jobs live in a SQLite file under ``cache_dir`` shared by every worker
+process on the host, so a restart does not lose queued work: whatever was
+queued is picked up again. A running job holds a lease that its worker
+keeps renewing; when a process dies (or hangs) the lease runs out and the
+job is put back in the queue.
+"""
+
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from app.core.local_store import open_sqlite
+
+_COLUMNS = "id, kind, status, stage, progress, params, result, error, created_at, updated_at"
+
+
+class JobStore:
+    """Queue and status table for background jobs."""
+
+    def __init__(self, path: str | Path, lease_seconds: float = 60.0):
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+            "stage TEXT, progress REAL NOT NULL DEFAULT 0, params TEXT NOT NULL, "
+            "data BLOB, result TEXT, error TEXT, lease_until REAL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def create(self, kind: str, params: dict, data: bytes | None = None) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, stage, progress, params, data, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', 'queued', 0, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), data, now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_next(self) -> tuple[dict, bytes | None] | None:
+        """Atomically mark the oldest queued job as running, under a fresh lease."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE jobs SET status = 'running', lease_until = ?, updated_at = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) "
+                f"RETURNING {_COLUMNS}, data",
+                (now + self.lease_seconds, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return self._to_dict(row[:-1]), row[-1]
+
+    def renew_lease(self, job_id: str) -> None:
+        """Keep a running job from being handed to another worker."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id),
+            )
+
+    def update_progress(self, job_id: str, stage: str, progress: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ?",
+                (stage, progress, time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, result=None, error: str | None = None) -> None:
+        """Record the outcome; the uploaded bytes are no longer needed."""
+        status = "failed" if error else "succeeded"
+        with self._lock:
+            # A failed job keeps the progress of the stage it failed in
+            self._db.execute(
+                "UPDATE jobs SET status = ?, stage = ?, "
+                "progress = CASE WHEN ? = 'succeeded' THEN 1.0 ELSE progress END, "
+                "result = ?, error = ?, data = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (
+                    status,
+                    status,
+                    status,
+                    json.dumps(result, default=str) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def release(self, job_id: str) -> None:
+        """Return a running job to the queue (e.g. on shutdown)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, "
+                "lease_until = NULL, updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id),
+            )
+
+    def requeue_orphans(self) -> int:
+        """Put back running jobs whose worker stopped renewing the lease."""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, "
+                "lease_until = NULL, updated_at = ? "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (now, now),
+            )
+        return cursor.rowcount
+
+    def prune(self, max_age_seconds: float) -> None:
+        """Forget finished jobs older than ``max_age_seconds``."""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (time.time() - max_age_seconds,),
+            )
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(zip([c.strip() for c in _COLUMNS.split(",")], row, strict=True))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
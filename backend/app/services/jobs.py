@@ -0,0 +1,171 @@
+"""Background job runner for uploads and LLM analyses.
+
+``POST /resume/jobs/...`` records a job in the ``JobStore`` and returns at
+once. A small pool of asyncio workers in each app process claims queued
+jobs and runs the same service code as the synchronous endpoints; the
+heavy lifting still happens in the parsing pool and behind the LLM
+scheduler. Workers report each stage to the store, which clients poll or
+watch over SSE.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.services.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+# Progress reported when each stage starts. "analyze" (NER plus the document
+# vector) is most of an upload's work; "skills" only embeds the skill names.
+STAGE_PROGRESS = {
+    "extract": 0.1,
+    "analyze": 0.25,
+    "skills": 0.75,
+    "store": 0.85,
+    "llm": 0.1,
+}
+
+Progress = Callable[[str], Awaitable[None]]
+Handler = Callable[[dict, bytes | None, Progress], Awaitable[object]]
+
+
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    return JobStore(Path(settings.cache_dir) / "jobs.sqlite3", lease_seconds=settings.job_lease_seconds)
+
+
+async def run_upload_job(job: dict, data: bytes | None, progress: Progress):
+    from app.database.database import get_async_db
+    from app.repositories.resume_repository import ResumeRepository
+    from app.schemas.resume import ResumeParseResponse
+    from app.services.resume_service import ResumeService
+
+    params = job["params"]
+    service = ResumeService(ResumeRepository(get_async_db()))
+    resume = await service.process_document(
+        params["filename"],
+        params["content_type"],
+        data or b"",
+        force_reparse=params.get("force_reparse", False),
+        progress=progress,
+    )
+    # Same fields as POST /resume/upload, not the stored row (embeddings, hash, ...)
+    return ResumeParseResponse.model_validate(resume).model_dump(mode="json")
+
+
+async def run_analysis_job(job: dict, data: bytes | None, progress: Progress):
+    from app.database.database import get_async_db
+    from app.repositories.match_repository import MatchRepository
+    from app.repositories.resume_repository import ResumeRepository
+    from app.services.llm import PRIORITY_BATCH
+    from app.services.match_service import MatchService
+
+    params = job["params"]
+    db = get_async_db()
+    service = MatchService(MatchRepository(db), ResumeRepository(db))
+    await progress("llm")
+    return await service.analyze_resume(
+        params["resume_id"],
+        params.get("job_description"),
+        refresh=params.get("refresh", False),
+        priority=PRIORITY_BATCH,
+    )
+
+
+class JobRunner:
+    """Per-process pool of asyncio workers draining the shared job queue."""
+
+    def __init__(self, workers: int, handlers: dict[str, Handler]):
+        self.workers = workers
+        self.handlers = handlers
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def store(self) -> JobStore:
+        return get_job_store()
+
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        requeued = self.store.requeue_orphans()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted job(s)")
+        self.store.prune(settings.job_retention_hours * 3600)
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Job runner started with {self.workers} worker(s)")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job runner stopped")
+
+    async def submit(self, kind: str, params: dict, data: bytes | None = None) -> dict:
+        if kind not in self.handlers:
+            raise AppException(status_code=400, message=f"Unknown job type: {kind}")
+        job = await asyncio.to_thread(self.store.create, kind, params, data)
+        # Back on the loop thread, where the event may be set safely
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            claimed = await asyncio.to_thread(self.store.claim_next)
+            if claimed is None:
+                # Pick up the jobs of a worker that died since we started
+                requeued = await asyncio.to_thread(self.store.requeue_orphans)
+                if requeued:
+                    logger.info(f"Requeued {requeued} job(s) with an expired lease")
+                    continue
+                # Other processes may enqueue too, so also poll the store
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_seconds)
+                continue
+            await self.run_job(*claimed)
+
+    async def run_job(self, job: dict, data: bytes | None) -> None:
+        job_id = job["id"]
+
+        async def progress(stage: str) -> None:
+            await asyncio.to_thread(self.store.update_progress, job_id, stage, STAGE_PROGRESS.get(stage, 0.0))
+
+        heartbeat = asyncio.create_task(self._renew_lease(job_id))
+        try:
+            result = await self.handlers[job["kind"]](job, data, progress)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job for the next process to pick up
+            await asyncio.to_thread(self.store.release, job_id)
+            raise
+        except AppException as e:
+            await asyncio.to_thread(self.store.finish, job_id, error=e.message)
+        except Exception as e:
+            logger.exception(f"Job {job_id} ({job['kind']}) failed")
+            error = str(e) if settings.debug else "Job failed unexpectedly"
+            await asyncio.to_thread(self.store.finish, job_id, error=error)
+        else:
+            await asyncio.to_thread(self.store.finish, job_id, result=result)
+        finally:
+            heartbeat.cancel()
+
+    async def _renew_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            await asyncio.to_thread(self.store.renew_lease, job_id)
+
+
+job_runner = JobRunner(
+    settings.job_workers,
+    {"upload": run_upload_job, "analyze": run_analysis_job},
+)
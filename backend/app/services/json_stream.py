@@ -0,0 +1,86 @@
+"""Incremental parser for a JSON object arriving in chunks.
+
+The LLM streams its analysis token by token. ``JsonFieldParser`` scans each
+chunk once and reports every top-level field of the object as soon as its
+value is complete, so e.g. ``summary`` can be shown long before the
+``suggestions`` list has been generated.
+"""
+
+import json
+
+
+class JsonFieldParser:
+    """Emit ``(key, value)`` for each completed top-level field."""
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # or "value"
+        self._key_start = 0
+        self._key: str | None = None
+        self._value_start = 0
+        self._emitted = True
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        self.text += chunk
+        fields = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = self._decode(text[self._key_start : i + 1])
+                    elif self._depth == 1:
+                        self._emit(text[self._value_start : i + 1], fields)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "value":
+                    # A nested object/array value just closed
+                    self._emit(text[self._value_start : i + 1], fields)
+                elif self._depth == 0 and self._expect == "value":
+                    self._emit(text[self._value_start : i], fields)
+            elif self._depth == 1 and c == ":":
+                self._expect = "value"
+                self._value_start = i + 1
+                self._emitted = False
+            elif self._depth == 1 and c == ",":
+                if self._expect == "value":
+                    self._emit(text[self._value_start : i], fields)
+                self._expect = "key"
+        self._pos = len(text)
+        return fields
+
+    def _emit(self, raw: str, fields: list) -> None:
+        if self._emitted or self._key is None:
+            return
+        self._emitted = True
+        value = self._decode(raw.strip())
+        if value is not _INVALID:
+            fields.append((self._key, value))
+
+    @staticmethod
+    def _decode(raw: str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return _INVALID
+
+
+_INVALID = object()
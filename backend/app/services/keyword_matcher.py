@@ -0,0 +1,96 @@
+"""Aho-Corasick keyword matcher with word-boundary checks.
+
+Builds a single automaton from a set of labelled keywords and reports every
+whole-word hit in one linear pass over the text, regardless of how many
+keywords there are. Matching is case-insensitive, except for short acronyms
+written with capitals ("R", "Go", "BE", "ME"), which must match exactly so
+that e.g. "contact me" does not count as a Master of Engineering.
+"""
+
+from collections import defaultdict, deque
+from collections.abc import Iterable
+
+# Keywords up to this length that contain uppercase letters match case-sensitively
+SHORT_ACRONYM_MAX_LEN = 2
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher over ``(keyword, label)`` pairs."""
+
+    def __init__(self, keywords: Iterable[tuple[str, str]]):
+        # Trie as parallel arrays: goto transitions, failure links, outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[str, str, int, bool]]] = [[]]
+
+        for keyword, label in keywords:
+            if keyword:
+                self._add(keyword, label)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, label: str) -> None:
+        state = 0
+        lowered = keyword.lower()
+        for ch in lowered:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+
+        case_sensitive = len(keyword) <= SHORT_ACRONYM_MAX_LEN and lowered != keyword
+        self._out[state].append((keyword, label, len(lowered), case_sensitive))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                # Inherit matches that end here via a shorter suffix
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> list[tuple[int, int, str, str]]:
+        """Return ``(start, end, keyword, label)`` for every whole-word hit."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Rare code points change length when lowercased; keep offsets aligned
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+        hits = []
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(lowered, start=1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+
+            after_ok = end == len(text) or not _is_word_char(text[end])
+            for keyword, label, length, case_sensitive in out[state]:
+                start = end - length
+                if not after_ok or (start > 0 and _is_word_char(text[start - 1])):
+                    continue
+                if case_sensitive and text[start:end] != keyword:
+                    continue
+                hits.append((start, end, keyword, label))
+        return hits
+
+    def find(self, text: str) -> dict[str, set[str]]:
+        """Return the set of matched keywords per label."""
+        found: dict[str, set[str]] = defaultdict(set)
+        for _, _, keyword, label in self.find_all(text):
+            found[label].add(keyword)
+        return found
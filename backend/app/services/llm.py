@@ -1,14 +1,198 @@
 import httpx
+import heapq
+import itertools
 import logging
 import json
+import random
 import re
 import asyncio
+import contextlib
+import time
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from pathlib import Path
+
 from app.core.config import settings
+from app.core.exceptions import AppException
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.json_stream import JsonFieldParser
+from app.services.llm_cache import AnalysisCache, analysis_cache_key
+from app.services.ollama_client import ollama_client
+from app.services.prompt_builder import pack_resume, pack_text
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_API_URL = f"{settings.ollama_base_url}/api/generate"
 DEFAULT_MODEL = settings.ollama_model
+# Bump when the prompt template changes, so cached analyses are regenerated
+PROMPT_VERSION = 2
+
+
+# Scheduler priority classes (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class LLMTicket:
+    """One scheduled generation; shared by every caller of the same key."""
+
+    def __init__(self, scheduler: "LLMScheduler", key: str | None, factory, priority: int, seq: int):
+        self.scheduler = scheduler
+        self.key = key
+        self.priority = priority
+        self.seq = seq
+        self._factory = factory
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.started = asyncio.Event()
+        self.started_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def __lt__(self, other: "LLMTicket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    @property
+    def position(self) -> int:
+        """Tickets queued ahead of this one (0 once it is running)."""
+        return self.scheduler.position(self)
+
+    @property
+    def wait_seconds(self) -> float:
+        """Estimated time until this generation starts."""
+        return self.scheduler.estimate_wait(self.position) if not self.started.is_set() else 0.0
+
+    def status(self) -> dict:
+        return {"position": self.position, "wait_seconds": round(self.wait_seconds, 1)}
+
+    async def result(self):
+        # Shielded: one caller going away must not cancel a shared generation
+        return await asyncio.shield(self.future)
+
+    def cancel(self) -> None:
+        """Abandon the generation (only used for unshared tickets)."""
+        self.scheduler.cancel(self)
+
+
+class LLMScheduler:
+    """
+    In-process admission control in front of Ollama.
+
+    At most ``max_concurrency`` generations run at once; the rest wait in a
+    priority queue bounded at ``max_queue`` (interactive requests go before
+    batch work, FIFO within a class). Submissions with a key that is already
+    queued or running join that ticket instead of generating again. Wait
+    estimates use a moving average of observed generation times.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, expected_seconds: float):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.avg_seconds = expected_seconds
+        self._waiting: list[LLMTicket] = []
+        self._running: set[LLMTicket] = set()
+        self._in_flight: dict[str, LLMTicket] = {}
+        self._seq = itertools.count()
+
+    def submit(
+        self,
+        key: str | None,
+        factory: Callable[[], Awaitable],
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> LLMTicket:
+        """Queue ``factory()`` (or join the in-flight ticket for ``key``)."""
+        if key is not None and key in self._in_flight:
+            return self._in_flight[key]
+        self.ensure_capacity()
+
+        ticket = LLMTicket(self, key, factory, priority, next(self._seq))
+        heapq.heappush(self._waiting, ticket)
+        if key is not None:
+            self._in_flight[key] = ticket
+        self._dispatch()
+        return ticket
+
+    def ensure_capacity(self) -> None:
+        if len(self._waiting) >= self.max_queue:
+            raise AppException(
+                status_code=503,
+                message="The AI service is busy, please retry shortly",
+                details={"queued": len(self._waiting), "wait_seconds": round(self.estimate_wait(len(self._waiting)), 1)},
+            )
+
+    def position(self, ticket: LLMTicket) -> int:
+        if ticket.started.is_set():
+            return 0
+        return sum(1 for other in self._waiting if other < ticket)
+
+    def estimate_wait(self, position: int) -> float:
+        if len(self._running) < self.max_concurrency:
+            return 0.0
+        # Slots free roughly every avg/concurrency seconds
+        return self.avg_seconds * (position // self.max_concurrency + 1)
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._running),
+            "queued": len(self._waiting),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_generation_seconds": round(self.avg_seconds, 1),
+            "estimated_wait_seconds": round(self.estimate_wait(len(self._waiting)), 1),
+        }
+
+    def cancel(self, ticket: LLMTicket) -> None:
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+            self._forget(ticket)
+            ticket.future.cancel()
+        elif ticket._task is not None:
+            ticket._task.cancel()
+
+    def _dispatch(self) -> None:
+        while self._waiting and len(self._running) < self.max_concurrency:
+            ticket = heapq.heappop(self._waiting)
+            self._running.add(ticket)
+            ticket.started_at = time.monotonic()
+            ticket.started.set()
+            ticket._task = asyncio.create_task(self._run(ticket))
+
+    async def _run(self, ticket: LLMTicket) -> None:
+        try:
+            result = await ticket._factory()
+        except BaseException as e:
+            if not ticket.future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    ticket.future.cancel()
+                else:
+                    ticket.future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            ticket.future.set_result(result)
+            elapsed = time.monotonic() - ticket.started_at
+            self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * elapsed
+        finally:
+            self._running.discard(ticket)
+            self._forget(ticket)
+            self._dispatch()
+
+    def _forget(self, ticket: LLMTicket) -> None:
+        if ticket.key is not None and self._in_flight.get(ticket.key) is ticket:
+            del self._in_flight[ticket.key]
+
+
+llm_scheduler = LLMScheduler(
+    settings.llm_max_concurrency, settings.llm_max_queue, settings.llm_expected_seconds
+)
+
+
+@lru_cache(maxsize=1)
+def get_analysis_cache() -> AnalysisCache:
+    return AnalysisCache(
+        Path(settings.cache_dir) / "llm_analyses.sqlite3",
+        model=DEFAULT_MODEL,
+        ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+        max_bytes=settings.llm_cache_mb * 1024 * 1024,
+    )
 
 
 def _extract_json(text: str) -> str:
@@ -29,22 +213,157 @@ def _extract_json(text: str) -> str:
     return text
 
 
-async def analyze_resume(resume_text: str, job_description: str | None = None) -> dict:
+async def analyze_resume(
+    resume_text: str,
+    job_description: str | None = None,
+    refresh: bool = False,
+    priority: int = PRIORITY_INTERACTIVE,
+    entities: dict | None = None,
+) -> dict:
     """
     Analyzes a resume using a local LLM via Ollama.
     Returns a dictionary with structured analysis including AI-generated insights.
+
+    Successful analyses are cached on disk; a repeat request for the same
+    resume, JD and model is answered from the cache (``"cached": true``)
+    unless ``refresh`` is set. Generations go through ``llm_scheduler``, so
+    concurrent identical requests share one generation. ``entities`` (the
+    resume's parsed skills/experience) are given priority in the prompt.
     """
+    cache = get_analysis_cache() if settings.llm_cache_enabled else None
+    key = analysis_cache_key(DEFAULT_MODEL, PROMPT_VERSION, resume_text, job_description)
+    if cache is not None and not refresh:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    payload = {
+        "model": DEFAULT_MODEL,
+        "prompt": build_prompt(resume_text, job_description, entities),
+        "stream": False,
+        "format": "json",
+    }
+
+    async def generate() -> dict:
+        analysis, cacheable = await _generate_analysis(payload)
+        if cache is not None and cacheable:
+            await asyncio.to_thread(cache.put, key, analysis)
+        return analysis
+
+    ticket = llm_scheduler.submit(key, generate, priority)
+    return dict(await ticket.result())
+
+
+async def stream_analysis(
+    resume_text: str,
+    job_description: str | None = None,
+    refresh: bool = False,
+    entities: dict | None = None,
+):
+    """
+    Streaming variant of ``analyze_resume``. Yields ``(event, data)`` pairs:
+    ``queued`` with the queue position while waiting for a generation slot,
+    ``token`` for each generated chunk, ``field`` as soon as a top-level field
+    of the JSON answer is complete, and finally ``result`` with the analysis.
+    """
+    cache = get_analysis_cache() if settings.llm_cache_enabled else None
+    key = analysis_cache_key(DEFAULT_MODEL, PROMPT_VERSION, resume_text, job_description)
+    if cache is not None and not refresh:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            for name, value in cached.items():
+                yield "field", {"name": name, "value": value}
+            yield "result", {**cached, "cached": True}
+            return
+
+    payload = {
+        "model": DEFAULT_MODEL,
+        "prompt": build_prompt(resume_text, job_description, entities),
+        "format": "json",
+    }
+    chunks: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async for chunk in ollama_client.stream_generate(payload):
+                chunks.put_nowait(chunk)
+                if chunk.get("done"):
+                    break
+        finally:
+            chunks.put_nowait(None)
+
+    fields = JsonFieldParser()
+    ticket = None
+    try:
+        # Streams can't be shared between callers, so no single-flight key
+        ticket = llm_scheduler.submit(None, produce, PRIORITY_INTERACTIVE)
+        while not ticket.started.is_set():
+            yield "queued", ticket.status()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(ticket.started.wait(), timeout=2.0)
+
+        while (chunk := await chunks.get()) is not None:
+            token = chunk.get("response", "")
+            if token:
+                yield "token", {"text": token}
+                for name, value in fields.feed(token):
+                    yield "field", {"name": name, "value": value}
+        await ticket.result()  # re-raise anything the producer hit
+        analysis, cacheable = _finalize_analysis(fields.text)
+    except CircuitOpenError as e:
+        analysis, cacheable = _error_analysis(e.message, "AI service unavailable."), False
+    except AppException as e:
+        analysis, cacheable = _error_analysis(e.message, "AI service busy."), False
+    except httpx.ConnectError:
+        logger.error("Could not connect to Ollama. Is it running?")
+        analysis, cacheable = _error_analysis(
+            "Ollama is not running. Please install Ollama and run 'ollama serve'.",
+            "AI service unavailable.",
+        ), False
+    except Exception as e:
+        logger.error(f"Streaming LLM analysis failed: {e}")
+        analysis, cacheable = _error_analysis(
+            f"Analysis failed: {str(e)}", "Analysis could not be completed."
+        ), False
+    finally:
+        # Client went away mid-stream: free the generation slot
+        if ticket is not None and not ticket.future.done():
+            ticket.cancel()
+
+    if cache is not None and cacheable:
+        await asyncio.to_thread(cache.put, key, analysis)
+    yield "result", analysis
+
+
+def build_prompt(
+    resume_text: str, job_description: str | None = None, entities: dict | None = None
+) -> str:
+    """The analysis prompt; bump ``PROMPT_VERSION`` when changing it.
+
+    The resume and JD are packed into ``llm_resume_token_budget`` and
+    ``llm_jd_token_budget`` tokens; ``entities`` are the resume's parsed
+    skills/experience, which are packed first.
+    """
+    resume = pack_resume(resume_text, entities, settings.llm_resume_token_budget)
+    jd = pack_text(job_description, settings.llm_jd_token_budget) if job_description else None
+    saved = resume.saved_tokens + (jd.saved_tokens if jd else 0)
+    logger.info(
+        f"Prompt packed: resume {resume.tokens}/{resume.original_tokens} tokens"
+        + (f", JD {jd.tokens}/{jd.original_tokens} tokens" if jd else "")
+        + f" (~{saved} tokens saved)"
+    )
 
     prompt = f"""You are an expert AI Resume Coach and Career Advisor. Analyze the following resume.
+The resume has been condensed: its most relevant sections come first.
 
-RESUME TEXT:
-{resume_text[:4000]}
+RESUME:
+{resume.text}
 """
 
     if job_description:
         prompt += f"""
 JOB DESCRIPTION:
-{job_description[:2000]}
+{jd.text}
 
 Task: Compare the resume against this job description and provide targeted feedback.
 """
@@ -71,83 +390,101 @@ Rules:
 - "keywords_to_add" are specific technical skills, certifications, or buzzwords the candidate should add.
 - Return RAW JSON only — NO markdown code blocks, NO introductory text, NO explanations outside the JSON.
 """
+    return prompt
 
-    payload = {
-        "model": DEFAULT_MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "format": "json",
+
+def _error_analysis(error: str, summary: str) -> dict:
+    """Placeholder analysis returned when generation fails."""
+    return {
+        "error": error,
+        "summary": summary,
+        "strengths": [],
+        "weaknesses": [],
+        "suggestions": [],
+        "keywords_to_add": [],
+        "score": 0,
+        "match_percentage": None,
     }
 
+
+def _finalize_analysis(generated_text: str) -> tuple[dict, bool]:
+    """Parse the model's full output into an analysis; ``(analysis, succeeded)``."""
+    if not generated_text:
+        raise ValueError("Empty response from LLM")
+
+    cleaned_text = _extract_json(generated_text)
+
+    try:
+        analysis = json.loads(cleaned_text)
+        # Ensure all expected fields have defaults
+        analysis.setdefault("keywords_to_add", [])
+        analysis.setdefault("match_percentage", None)
+        analysis.setdefault("strengths", [])
+        analysis.setdefault("weaknesses", [])
+        analysis.setdefault("suggestions", [])
+        return analysis, True
+    except json.JSONDecodeError as e:
+        logger.error(
+            f"Failed to parse LLM response. Raw: {generated_text[:200]}... Error: {e}"
+        )
+        return {
+            "summary": "Could not parse AI analysis. The model may have returned malformed output.",
+            "strengths": [],
+            "weaknesses": [],
+            "suggestions": ["Please try again. If the issue persists, ensure Ollama is running the correct model."],
+            "keywords_to_add": [],
+            "score": 0,
+            "match_percentage": None,
+        }, False
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt + 1``."""
+    cap = min(settings.ollama_retry_max_seconds, settings.ollama_retry_base_seconds * 2**attempt)
+    return random.uniform(0, cap)
+
+
+async def _generate_analysis(payload: dict) -> tuple[dict, bool]:
+    """Call Ollama with retries; returns ``(analysis, succeeded)``."""
     for attempt in range(3):
+        if attempt:
+            await asyncio.sleep(_backoff_delay(attempt - 1))
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(OLLAMA_API_URL, json=payload)
-
-                if response.status_code == 200:
-                    result = response.json()
-                    generated_text = result.get("response", "")
-
-                    if not generated_text:
-                        raise ValueError("Empty response from LLM")
-
-                    cleaned_text = _extract_json(generated_text)
-
-                    try:
-                        analysis = json.loads(cleaned_text)
-                        # Ensure all expected fields have defaults
-                        analysis.setdefault("keywords_to_add", [])
-                        analysis.setdefault("match_percentage", None)
-                        analysis.setdefault("strengths", [])
-                        analysis.setdefault("weaknesses", [])
-                        analysis.setdefault("suggestions", [])
-                        return analysis
-                    except json.JSONDecodeError as e:
-                        logger.error(
-                            f"Failed to parse LLM response. Raw: {generated_text[:200]}... Error: {e}"
-                        )
-                        return {
-                            "summary": "Could not parse AI analysis. The model may have returned malformed output.",
-                            "strengths": [],
-                            "weaknesses": [],
-                            "suggestions": ["Please try again. If the issue persists, ensure Ollama is running the correct model."],
-                            "keywords_to_add": [],
-                            "score": 0,
-                            "match_percentage": None,
-                        }
-
-                elif response.status_code >= 500:
-                    logger.warning(
-                        f"Ollama returned {response.status_code}. Attempt {attempt + 1}/3."
-                    )
-                    await asyncio.sleep(2)
-                    continue
-                else:
-                    logger.error(f"Ollama error {response.status_code}: {response.text}")
-                    response.raise_for_status()
+            response = await ollama_client.generate(payload)
+
+            if response.status_code == 200:
+                result = response.json()
+                return _finalize_analysis(result.get("response", ""))
 
+            elif response.status_code >= 500:
+                logger.warning(
+                    f"Ollama returned {response.status_code}. Attempt {attempt + 1}/3."
+                )
+                continue
+            else:
+                logger.error(f"Ollama error {response.status_code}: {response.text}")
+                response.raise_for_status()
+
+        except CircuitOpenError as e:
+            # Retrying can't help until the breaker lets a trial through
+            logger.warning(f"Skipping LLM analysis: {e.message}")
+            return _error_analysis(e.message, "AI service unavailable."), False
         except httpx.ConnectError:
             logger.error("Could not connect to Ollama. Is it running?")
-            return {
-                "error": "Ollama is not running. Please install Ollama and run 'ollama serve'.",
-                "summary": "AI service unavailable.",
-                "strengths": [],
-                "weaknesses": [],
-                "suggestions": [],
-                "keywords_to_add": [],
-                "score": 0,
-                "match_percentage": None,
-            }
+            return _error_analysis(
+                "Ollama is not running. Please install Ollama and run 'ollama serve'.",
+                "AI service unavailable.",
+            ), False
         except Exception as e:
             logger.error(f"LLM Analysis failed attempt {attempt + 1}: {e}")
             if attempt == 2:
-                return {
-                    "error": f"Analysis failed after 3 attempts: {str(e)}",
-                    "summary": "Analysis could not be completed.",
-                    "strengths": [],
-                    "weaknesses": [],
-                    "suggestions": [],
-                    "keywords_to_add": [],
-                    "score": 0,
-                    "match_percentage": None,
-                }
+                return _error_analysis(
+                    f"Analysis failed after 3 attempts: {str(e)}",
+                    "Analysis could not be completed.",
+                ), False
+
+    # Every attempt got a 5xx from Ollama
+    return _error_analysis(
+        "Analysis failed after 3 attempts: Ollama kept returning server errors",
+        "Analysis could not be completed.",
+    ), False
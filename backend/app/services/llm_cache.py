@@ -0,0 +1,103 @@
+"""On-disk cache of LLM resume analyses.
+
+A generation takes 10-60 seconds, and users re-run the same analysis often.
+Results are stored in a SQLite file under ``cache_dir`` (shared by every
+worker on the host), keyed by model, prompt template version and the
+hashes of the resume and job description texts. Entries expire after a
+TTL, the oldest are evicted once the store exceeds its byte budget, and
+entries made by any other model are purged when the cache is opened.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+from app.core.local_store import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def analysis_cache_key(
+    model: str, prompt_version: int, resume_text: str, job_description: str | None
+) -> str:
+    """Fingerprint of everything that determines an analysis."""
+    parts = [model, f"v{prompt_version}", _sha256(resume_text), _sha256(job_description or "")]
+    return _sha256("\0".join(parts))
+
+
+class AnalysisCache:
+    """TTL + size-bounded store of analysis dicts."""
+
+    def __init__(self, path: str | Path, model: str, ttl_seconds: int, max_bytes: int):
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, created_at REAL NOT NULL, "
+            "size INTEGER NOT NULL, value TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at)")
+        self.purge_other_models()
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM analyses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if time.time() - row[1] > self.ttl_seconds:
+                    self._db.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                    return None
+                return json.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Analysis cache read failed: {e}")
+            return None
+
+    def put(self, key: str, analysis: dict) -> None:
+        value = json.dumps(analysis)
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analyses (key, model, created_at, size, value) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, self.model, time.time(), len(value), value),
+                )
+                self._evict()
+        except Exception as e:
+            # Best-effort: a failed write only costs a future regeneration
+            logger.warning(f"Analysis cache write failed: {e}")
+
+    def purge_other_models(self) -> None:
+        """Drop entries generated by a model other than the configured one."""
+        with self._lock:
+            self._db.execute("DELETE FROM analyses WHERE model != ?", (self.model,))
+
+    def _evict(self) -> None:
+        self._db.execute(
+            "DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM analyses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk from the oldest entry until enough bytes are freed
+        excess, cutoff = total - self.max_bytes, None
+        for created_at, size in self._db.execute(
+            "SELECT created_at, size FROM analyses ORDER BY created_at"
+        ):
+            excess -= size
+            cutoff = created_at
+            if excess <= 0:
+                break
+        self._db.execute("DELETE FROM analyses WHERE created_at <= ?", (cutoff,))
@@ -1,36 +1,74 @@
+import base64
+import binascii
+from datetime import datetime
+
+from app.core.config import settings
 from app.repositories.match_repository import MatchRepository
 from app.repositories.resume_repository import ResumeRepository
-from app.services import parser
-from app.services.llm import analyze_resume
+from app.services.executor import (
+    match_job_description,
+    missing_skills_for_resumes,
+    parse_job_description,
+    parsing_executor,
+    resume_query_vector,
+)
+from app.services.parser import embedding_signature
+from app.services.stats_cache import STATS_KEY, get_stats_cache, invalidate_stats
+from app.services.vector_index import get_job_index, get_resume_index
+from app.services.llm import (
+    PRIORITY_INTERACTIVE,
+    analyze_resume,
+    llm_scheduler,
+    stream_analysis,
+)
 from app.core.exceptions import AppException
 
+
+def _parsed_entities(resume: dict) -> dict:
+    """The entity columns of a resume row, as the prompt builder takes them."""
+    return {key: resume.get(key) or [] for key in ("skills", "experience", "education")}
+
+
+def encode_cursor(created_at: str, match_id: int) -> str:
+    """Opaque keyset cursor pointing just after the match ``(created_at, id)``."""
+    return base64.urlsafe_b64encode(f"{created_at}|{match_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, match_id = raw.rsplit("|", 1)
+        # The timestamp ends up inside a PostgREST filter, so it must parse
+        datetime.fromisoformat(created_at)
+        return created_at, int(match_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise AppException(status_code=400, message="Invalid cursor") from e
+
+
 class MatchService:
     def __init__(self, match_repo: MatchRepository, resume_repo: ResumeRepository):
         self.match_repo = match_repo
         self.resume_repo = resume_repo
 
     async def create_match(self, resume_id: int, jd_text: str):
-        # Verify resume exists
-        resume = self.resume_repo.get_by_id(resume_id)
+        # Verify resume exists (with stored vectors, so the match can reuse them)
+        resume = await self.resume_repo.get_by_id(resume_id, include_embeddings=True)
         if not resume:
             raise AppException(status_code=404, message="Resume not found")
 
-        # Process JD
-        jd_entities = parser.extract_entities(jd_text)
-        
-        # Calculate Match
-        match_score, missing = parser.calculate_match(
-            resume_text=resume["text"],
-            resume_skills=resume.get("skills", []),
-            jd_text=jd_text,
-            jd_skills=jd_entities.get("skills", [])
+        # Process JD and calculate match (off the event loop)
+        jd_entities, match_score, missing, jd_embedding = await parsing_executor.run(
+            match_job_description, resume, jd_text
         )
 
-        # Save JD
-        job = self.match_repo.create_job({
+        # Save JD (with its vector, so it can be ranked for other resumes)
+        job = await self.match_repo.create_job({
             "description": jd_text,
-            "skills": jd_entities.get("skills", [])
+            "skills": jd_entities.get("skills", []),
+            "embeddings": jd_embedding,
+            "embedding_model": embedding_signature(),
         })
+        get_job_index().add(job["id"], jd_embedding)
 
         # Save Match
         match_data = {
@@ -40,39 +78,158 @@ class MatchService:
             "missing_skills": missing
         }
         
-        return self.match_repo.create_match(match_data), job, jd_entities
+        match = await self.match_repo.create_match(match_data)
+        await invalidate_stats()
+        return match, job, jd_entities
 
-    async def analyze_resume(self, resume_id: int, job_description: str | None = None):
-        resume = self.resume_repo.get_by_id(resume_id)
+    async def search_resumes(self, jd_text: str, top_k: int):
+        """Rank stored resumes against a JD by embedding similarity."""
+        index = get_resume_index()
+        if index.needs_sync(settings.search_index_sync_seconds):
+            await index.sync(self.resume_repo.list_embedding_ids, self.resume_repo.get_embeddings)
+
+        jd_entities, jd_embedding = await parsing_executor.run(parse_job_description, jd_text)
+        jd_skills = jd_entities.get("skills", [])
+        hits = index.search(jd_embedding, top_k)
+        if not hits:
+            return {"jd_skills": jd_skills, "results": []}
+
+        rows = await self.resume_repo.get_many([resume_id for resume_id, _ in hits])
+        rows = {r["id"]: r for r in rows}
+        ranked = [(rows[resume_id], score) for resume_id, score in hits if resume_id in rows]
+        missing = await parsing_executor.run(
+            missing_skills_for_resumes, [row for row, _ in ranked], jd_text, jd_skills, jd_embedding
+        )
+
+        return {
+            "jd_skills": jd_skills,
+            "results": [
+                {
+                    "resume_id": row["id"],
+                    "filename": row.get("filename"),
+                    "score": round(score * 100, 2),
+                    "missing_skills": missing_skills,
+                }
+                for (row, score), missing_skills in zip(ranked, missing, strict=True)
+            ],
+        }
+
+    async def rank_jobs_for_resume(self, resume_id: int, top_n: int):
+        """Rank stored job descriptions for a resume.
+
+        Candidates come from the job index by embedding similarity; each is
+        then re-scored as 70% semantic similarity and 30% coverage of the
+        JD's skills by the resume's skills. Repeated identical descriptions
+        (one is stored per match) are collapsed to their best entry.
+        """
+        resume = await self.resume_repo.get_by_id(resume_id, include_embeddings=True)
+        if not resume:
+            raise AppException(status_code=404, message="Resume not found")
+
+        index = get_job_index()
+        if index.needs_sync(settings.search_index_sync_seconds):
+            await index.sync(self.match_repo.list_job_embedding_ids, self.match_repo.get_job_embeddings)
+
+        query = await parsing_executor.run(resume_query_vector, resume)
+        hits = index.search(query, max(top_n * 5, 50))
+        if not hits:
+            return {"resume_id": resume_id, "results": []}
+
+        jobs = await self.match_repo.get_jobs([job_id for job_id, _ in hits])
+        jobs = {j["id"]: j for j in jobs}
+        resume_skills = {s.lower() for s in resume.get("skills") or []}
+
+        best: dict[str, dict] = {}
+        for job_id, similarity in hits:
+            job = jobs.get(job_id)
+            if not job:
+                continue
+            jd_skills = job.get("skills") or []
+            matched = [s for s in jd_skills if s.lower() in resume_skills]
+            coverage = len(matched) / len(jd_skills) if jd_skills else 0.0
+            score = round((0.7 * max(similarity, 0.0) + 0.3 * coverage) * 100, 2)
+
+            key = " ".join((job.get("description") or "").lower().split())
+            if key in best and best[key]["score"] >= score:
+                continue
+            best[key] = {
+                "jd_id": job_id,
+                "jd_text": job.get("description") or "",
+                "score": score,
+                "similarity": round(similarity * 100, 2),
+                "skill_coverage": round(coverage * 100, 2),
+                "matched_skills": matched,
+                "missing_skills": [s for s in jd_skills if s.lower() not in resume_skills],
+                "created_at": job.get("created_at"),
+            }
+
+        ranked = sorted(best.values(), key=lambda r: r["score"], reverse=True)
+        return {"resume_id": resume_id, "results": ranked[:top_n]}
+
+    async def analyze_resume(
+        self,
+        resume_id: int,
+        job_description: str | None = None,
+        refresh: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+    ):
+        resume = await self.resume_repo.get_by_id(resume_id)
         if not resume:
             raise AppException(status_code=404, message="Resume not found")
             
-        return await analyze_resume(resume["text"], job_description)
+        return await analyze_resume(
+            resume["text"],
+            job_description,
+            refresh=refresh,
+            priority=priority,
+            entities=_parsed_entities(resume),
+        )
+
+    async def stream_analysis(
+        self, resume_id: int, job_description: str | None = None, refresh: bool = False
+    ):
+        """Event stream for ``/analyze/stream``; the resume is checked up front."""
+        resume = await self.resume_repo.get_by_id(resume_id)
+        if not resume:
+            raise AppException(status_code=404, message="Resume not found")
+        # Refuse before the 200 stream starts if the queue is already full
+        llm_scheduler.ensure_capacity()
 
-    def list_matches(self):
-        return self.match_repo.get_all_matches()
+        return stream_analysis(
+            resume["text"], job_description, refresh=refresh, entities=_parsed_entities(resume)
+        )
+
+    async def list_matches(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        resume_id: int | None = None,
+        min_score: float | None = None,
+        max_score: float | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """One page of match history and the cursor of the next page (if any)."""
+        # Ask for one extra row to learn whether another page exists
+        rows = await self.match_repo.get_matches_page(
+            limit + 1,
+            after=decode_cursor(cursor) if cursor else None,
+            resume_id=resume_id,
+            min_score=min_score,
+            max_score=max_score,
+        )
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return page, next_cursor
 
-    def delete_match(self, match_id: int):
-        if not self.match_repo.get_match_by_id(match_id):
+    async def delete_match(self, match_id: int):
+        if not await self.match_repo.get_match_by_id(match_id):
             raise AppException(status_code=404, message="Match not found")
-        self._invalidate_stats_cache()
-        return self.match_repo.delete_match(match_id)
-
-    # ── Stats with TTL cache ────────────────────────────────────────────────
-    _stats_cache: dict = {}
-    _stats_cache_ttl: int = 60  # seconds
-
-    def _invalidate_stats_cache(self):
-        MatchService._stats_cache.clear()
-
-    def get_stats(self):
-        import time
-        cached = MatchService._stats_cache
-        now = time.monotonic()
-        if cached and now - cached.get("_ts", 0) < self._stats_cache_ttl:
-            return {k: v for k, v in cached.items() if k != "_ts"}
-        result = self.match_repo.get_stats()
-        resume_count = self.resume_repo.count()
-        payload = {"total_resumes": resume_count, **result}
-        MatchService._stats_cache = {**payload, "_ts": now}
-        return payload
+        deleted = await self.match_repo.delete_match(match_id)
+        await invalidate_stats()
+        return deleted
+
+    async def get_stats(self):
+        # Shared by all workers; every write path calls invalidate_stats()
+        return await get_stats_cache().get_or_compute(STATS_KEY, self.match_repo.get_stats)
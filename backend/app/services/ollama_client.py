@@ -0,0 +1,193 @@
+"""Long-lived HTTP client for the Ollama API.
+
+One ``httpx.AsyncClient`` per worker keeps connections to Ollama alive
+between requests instead of paying TCP setup on every call. It is opened
+in the app lifespan and closed on shutdown; the pool limits and the
+connect/read/write/pool timeouts come from settings.
+
+Every call goes through a circuit breaker, so a wedged Ollama makes
+requests fail fast instead of each sitting in a long read timeout. A
+background task probes ``/api/tags`` periodically (and whenever the breaker
+is half-open), which also keeps the model list behind
+``/resume/ollama/status`` fresh without a live call per status request.
+While the breaker is closed the probes only feed that status; they are kept
+out of its window, so a steady stream of cheap successful probes can't
+outvote failing generations.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaClient:
+    """Pooled async client for every call the app makes to Ollama."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._client: httpx.AsyncClient | None = None
+        self._monitor: asyncio.Task | None = None
+        self.available_models: list[str] = []
+        self.breaker = CircuitBreaker(
+            "Ollama",
+            failure_rate=settings.ollama_breaker_failure_rate,
+            min_calls=settings.ollama_breaker_min_calls,
+            window=settings.ollama_breaker_window,
+            open_seconds=settings.ollama_breaker_open_seconds,
+            slow_call_seconds=settings.ollama_breaker_slow_seconds,
+        )
+
+    def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=settings.ollama_max_connections,
+                max_keepalive_connections=settings.ollama_max_keepalive_connections,
+                keepalive_expiry=settings.ollama_keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.ollama_connect_timeout,
+                read=settings.ollama_read_timeout,
+                write=settings.ollama_write_timeout,
+                pool=settings.ollama_pool_timeout,
+            ),
+        )
+        logger.info(f"Ollama client ready for {self.base_url}")
+
+    def start_monitor(self) -> None:
+        """Start the background health probe (needs a running event loop)."""
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._probe_loop())
+
+    async def aclose(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Started by the lifespan; created lazily when running without one
+        self.start()
+        return self._client
+
+    async def generate(self, payload: dict) -> httpx.Response:
+        """POST ``/api/generate``."""
+        return await self._call(lambda: self.client.post("/api/generate", json=payload))
+
+    async def stream_generate(self, payload: dict):
+        """POST ``/api/generate`` with streaming on; yields each NDJSON chunk.
+
+        The breaker judges the stream by its time to first chunk, since a
+        long generation is not a slow server.
+        """
+        self.breaker.before_call()
+        started = time.monotonic()
+        recorded = False
+        try:
+            async with self.client.stream(
+                "POST", "/api/generate", json={**payload, "stream": True}
+            ) as response:
+                if response.status_code >= 500:
+                    recorded = True
+                    self.breaker.record(False, time.monotonic() - started, f"HTTP {response.status_code}")
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not recorded:
+                        recorded = True
+                        self.breaker.record(True, time.monotonic() - started)
+                    if line.strip():
+                        yield json.loads(line)
+        except httpx.TransportError as e:
+            if not recorded:
+                recorded = True
+                self.breaker.record(False, time.monotonic() - started, type(e).__name__)
+            raise
+        finally:
+            if not recorded:
+                self.breaker.cancel_call()
+
+    async def tags(self, timeout: float | None = None, probe: bool = False) -> httpx.Response:
+        """GET ``/api/tags`` (installed models); doubles as a liveness probe.
+
+        A ``probe`` only counts towards the breaker as its half-open trial.
+        """
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        if probe and self.breaker.state == "closed":
+            response = await self._observe(lambda: self.client.get("/api/tags", **kwargs))
+        else:
+            response = await self._call(lambda: self.client.get("/api/tags", **kwargs))
+        if response.status_code == 200:
+            self.available_models = [m.get("name", "") for m in response.json().get("models", [])]
+        return response
+
+    def status(self) -> dict:
+        """Health as last observed; never calls Ollama."""
+        breaker = self.breaker.snapshot()
+        if breaker["state"] == "open":
+            status = "offline"
+        elif breaker["state"] == "half_open":
+            status = "degraded"
+        elif self.breaker.last_call_at is None:
+            status = "unknown"
+        elif self.breaker.last_success_at == self.breaker.last_call_at:
+            status = "online"
+        else:
+            status = "degraded"
+        return {
+            "status": status,
+            "model": settings.ollama_model,
+            "available_models": self.available_models if status != "offline" else [],
+            "breaker": breaker,
+        }
+
+    async def _call(self, send) -> httpx.Response:
+        self.breaker.before_call()
+        started = time.monotonic()
+        try:
+            response = await send()
+        except httpx.TransportError as e:
+            self.breaker.record(False, time.monotonic() - started, type(e).__name__)
+            raise
+        except BaseException:
+            self.breaker.cancel_call()
+            raise
+        ok = response.status_code < 500
+        self.breaker.record(ok, time.monotonic() - started, None if ok else f"HTTP {response.status_code}")
+        return response
+
+    async def _observe(self, send) -> httpx.Response:
+        try:
+            response = await send()
+        except httpx.TransportError as e:
+            self.breaker.observe(False, type(e).__name__)
+            raise
+        ok = response.status_code < 500
+        self.breaker.observe(ok, None if ok else f"HTTP {response.status_code}")
+        return response
+
+    async def _probe_loop(self) -> None:
+        while True:
+            try:
+                await self.tags(timeout=5.0, probe=True)
+            except Exception as e:
+                # CircuitOpenError while cooling down, or the probe itself failed
+                logger.debug(f"Ollama probe: {e}")
+            # Come back as soon as the breaker is ready for its trial call
+            await asyncio.sleep(self.breaker.retry_in() or settings.ollama_probe_interval)
+
+
+ollama_client = OllamaClient(settings.ollama_base_url)
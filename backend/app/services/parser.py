@@ -1,15 +1,114 @@
+import io
+import json
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import Path
+
 import docx
 import fitz  # PyMuPDF
+import numpy as np
 import spacy
+import torch
 from sentence_transformers import SentenceTransformer, util
 
 from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.skill_store import SkillEmbeddingStore
+
+# Bump when the way stored vectors are computed changes, so old rows are recomputed
+EMBEDDING_VERSION = 1
+
+
+# Components extract_entities never reads (it only looks at doc.ents)
+NER_EXCLUDED_COMPONENTS = [
+    "tagger",
+    "morphologizer",
+    "parser",
+    "senter",
+    "attribute_ruler",
+    "lemmatizer",
+]
+
+
+def load_nlp(model: str, profile: str = "ner"):
+    """
+    Load a spaCy pipeline for the given profile.
+
+    ``"ner"`` skips the tagger, parser and friends, then drops a shared
+    ``tok2vec``/``transformer`` if nothing left in the pipeline listens to
+    it. ``"full"`` loads the pipeline as packaged.
+    """
+    if profile == "full":
+        return spacy.load(model)
+
+    nlp = spacy.load(model, exclude=NER_EXCLUDED_COMPONENTS)
+    for name in ("tok2vec", "transformer"):
+        if name in nlp.pipe_names:
+            listeners = set(getattr(nlp.get_pipe(name), "listening_components", []))
+            if not listeners & set(nlp.pipe_names):
+                nlp.remove_pipe(name)
+    return nlp
+
+
+@lru_cache(maxsize=1)
+def get_nlp():
+    """Load the spaCy pipeline on first use (once per process)."""
+    return load_nlp(settings.spacy_model, settings.spacy_profile)
+
+
+def pipe_docs(texts: list[str], batch_size: int | None = None, n_process: int | None = None):
+    """Run texts through ``nlp.pipe`` with the configured batching.
+
+    Calls that fit in one batch stay in-process; forking helpers would cost
+    more than the single batch they'd share.
+    """
+    batch_size = batch_size or settings.spacy_batch_size
+    n_process = n_process or settings.spacy_n_process
+    if len(texts) <= batch_size:
+        n_process = 1
+    return get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model() -> SentenceTransformer:
+    """Load the sentence embedding model on first use (once per process)."""
+    return SentenceTransformer(settings.embedding_model)
 
 
-nlp = spacy.load(settings.spacy_model)
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    disk_path = None
+    if settings.embedding_cache_persist:
+        disk_path = Path(settings.cache_dir) / "embeddings.sqlite3"
+    return EmbeddingCache(
+        settings.embedding_model,
+        max_bytes=settings.embedding_cache_mb * 1024 * 1024,
+        disk_path=disk_path,
+        max_disk_bytes=settings.embedding_cache_disk_mb * 1024 * 1024,
+    )
 
 
-embedding_model = SentenceTransformer(settings.embedding_model)
+def _encode_uncached(texts: list[str]) -> np.ndarray:
+    return get_embedding_model().encode(texts, convert_to_numpy=True, show_progress_bar=False)
+
+
+def encode(texts: list[str]) -> torch.Tensor:
+    """Embed ``texts`` as a ``(n, dim)`` tensor; only uncached texts hit the model."""
+    return torch.from_numpy(get_embedding_cache().encode(texts, _encode_uncached))
+
+
+def embedding_signature() -> str:
+    """Identifies the model and method behind stored embeddings."""
+    return f"{settings.embedding_model}:v{EMBEDDING_VERSION}"
+
+
+def load_models() -> None:
+    """Eagerly load models and the skill store, e.g. when a parsing worker starts."""
+    get_nlp()
+    get_embedding_model()
+    get_skill_embeddings()
 
 
 SKILL_KEYWORDS = [
@@ -189,45 +288,150 @@ ROLE_SKILL_MAP = {
     ],
 }
 
+KEYWORD_MATCHER = KeywordMatcher(
+    [(kw, "skill") for kw in SKILL_KEYWORDS]
+    + [(kw, "education") for kw in EDUCATION_KEYWORDS]
+    + [(role, "role") for role in ROLE_SKILL_MAP]
+)
+
+
+@lru_cache(maxsize=1)
+def get_skill_embeddings() -> np.ndarray:
+    """Memory-mapped embeddings of ``SKILL_KEYWORDS``, rebuilt when stale."""
+    store = SkillEmbeddingStore(settings.cache_dir, settings.embedding_model, SKILL_KEYWORDS)
+    return store.load(lambda skills: encode(skills).numpy())
 
 
-def extract_text(file_path: str) -> str:
-    """Extract text from PDF or DOCX file."""
-    if file_path.endswith(".pdf"):
-        text = ""
-        with fitz.open(file_path) as doc:
-            for page in doc:
-                text += page.get_text()
-        return text
-    elif file_path.endswith(".docx"):
-        doc = docx.Document(file_path)
-        return "\n".join([p.text for p in doc.paragraphs])
+def iter_pdf_pages(doc, start: int = 0, stop: int | None = None):
+    """Yield the text of pages ``start`` up to ``stop`` (exclusive) of an open PDF."""
+    stop = doc.page_count if stop is None else min(stop, doc.page_count)
+    for number in range(start, stop):
+        yield doc[number].get_text()
+
+
+def pdf_page_count(data: bytes) -> int:
+    """Number of pages in a PDF, without extracting anything."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def extract_pdf_pages(data: bytes, start: int, stop: int) -> str:
+    """Text of one page range of a PDF; used to split large documents."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "".join(iter_pdf_pages(doc, start, stop))
+
+
+def extract_text(source: str | bytes, ext: str | None = None, max_pages: int | None = None) -> str:
+    """Extract text from a PDF or DOCX, given a file path or the raw bytes.
+
+    Bytes are read in memory (no temp file). ``ext`` is required for bytes and
+    otherwise taken from the path; ``max_pages`` defaults to the configured cap.
+    """
+    if ext is None:
+        ext = str(source).rsplit(".", 1)[-1]
+    ext = ext.lower().lstrip(".")
+    if max_pages is None:
+        max_pages = settings.pdf_max_pages
+
+    if ext == "pdf":
+        doc = fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+        with doc:
+            return "".join(iter_pdf_pages(doc, 0, max_pages or None))
+    elif ext == "docx":
+        document = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+        return "\n".join(p.text for p in document.paragraphs)
     else:
         raise ValueError("Unsupported file type, only PDF or DOCX allowed")
 
 
+@dataclass
+class DocumentAnalysis:
+    """Everything derived from one document's text, computed in a single pass.
+
+    Segments and the whole text are embedded in one encode call and the text
+    goes through NER once; entities, stored vectors and match scoring all
+    read from here instead of re-encoding the document.
+    """
+
+    text: str
+    segments: list[str]
+    segment_embeddings: np.ndarray  # (len(segments), dim)
+    embedding: np.ndarray  # whole-document vector, as stored in the DB
+    keyword_hits: dict[str, set]
+    ner_entities: list[tuple[str, str]]  # (text, label)
+    entities: dict
+
+    @cached_property
+    def text_lower(self) -> str:
+        return self.text.lower()
+
+
+def analyze_document(text: str) -> DocumentAnalysis:
+    return analyze_documents([text])[0]
+
+
+def analyze_documents(texts: list[str], batch_size: int | None = None) -> list[DocumentAnalysis]:
+    """
+    Analyze many texts at once: one ``nlp.pipe`` pass and one batched encode
+    of every text's segments plus the texts themselves.
+    """
+    segments_per_text = [_split_segments(text) for text in texts]
+    all_segments = [seg for segments in segments_per_text for seg in segments]
+    vectors = encode(all_segments + list(texts)).numpy() if texts else np.zeros((0, 0), np.float32)
+    segment_vectors, document_vectors = vectors[: len(all_segments)], vectors[len(all_segments) :]
+
+    semantic_skills = _detect_skills(segments_per_text, segment_vectors, SKILL_KEYWORDS)
+    docs = pipe_docs(texts, batch_size=batch_size)
+
+    analyses, offset = [], 0
+    for text, segments, doc, semantic, embedding in zip(
+        texts, segments_per_text, docs, semantic_skills, document_vectors, strict=True
+    ):
+        ner_entities = [(ent.text, ent.label_) for ent in doc.ents]
+        keyword_hits = KEYWORD_MATCHER.find(text)
+        analyses.append(
+            DocumentAnalysis(
+                text=text,
+                segments=segments,
+                segment_embeddings=segment_vectors[offset : offset + len(segments)],
+                embedding=embedding,
+                keyword_hits=keyword_hits,
+                ner_entities=ner_entities,
+                entities=_collect_entities(ner_entities, keyword_hits, semantic),
+            )
+        )
+        offset += len(segments)
+    return analyses
+
 
 def extract_entities(text: str) -> dict:
-    doc = nlp(text)
+    return extract_entities_batch([text])[0]
+
+
+def extract_entities_batch(texts: list[str], batch_size: int | None = None) -> list[dict]:
+    """Entities for many texts; see ``analyze_documents`` for the full bundle."""
+    return [analysis.entities for analysis in analyze_documents(texts, batch_size)]
+
+
+def _collect_entities(ner_entities: list[tuple[str, str]], hits: dict, semantic_skills: set) -> dict:
     skills, education, experience = set(), set(), set()
-    text_lower = text.lower()
 
     # Extract experience & education from NLP entities
-    for ent in doc.ents:
-        if ent.label_ in ["ORG", "WORK_OF_ART"]:
-            experience.add(ent.text)
-        elif ent.label_ in ["FAC", "GPE"]:
-            education.add(ent.text)
+    for ent_text, label in ner_entities:
+        if label in ["ORG", "WORK_OF_ART"]:
+            experience.add(ent_text)
+        elif label in ["FAC", "GPE"]:
+            education.add(ent_text)
 
-    skills.update([kw for kw in SKILL_KEYWORDS if kw.lower() in text_lower])
-    education.update([kw for kw in EDUCATION_KEYWORDS if kw.lower() in text_lower])
+    # Whole-word keyword hits for all tables in a single pass
+    skills.update(hits["skill"])
+    education.update(hits["education"])
 
     # Implied skills from role mentions
-    for role, implied_skills in ROLE_SKILL_MAP.items():
-        if role in text_lower:
-            skills.update(implied_skills)
+    for role in hits["role"]:
+        skills.update(ROLE_SKILL_MAP[role])
 
-    skills.update(extract_semantic_skills(text, SKILL_KEYWORDS))
+    skills.update(semantic_skills)
 
     return {
         "skills": list(skills),
@@ -236,55 +440,139 @@ def extract_entities(text: str) -> dict:
     }
 
 
+def _split_segments(text: str) -> list[str]:
+    # Split into meaningful sentences/segments
+    return [s.strip() for s in re.split(r"[.\n]", text) if len(s.strip()) > 10]
+
 
 def extract_semantic_skills(text: str, skill_list: list, threshold: float = 0.5) -> set:
     """
     Optimized: Returns skills that are semantically present in the text.
     Uses batch encoding and avoids re-encoding in the loop.
     """
-    import re
-    import torch
+    return extract_semantic_skills_batch([text], skill_list, threshold)[0]
+
+
+def extract_semantic_skills_batch(
+    texts: list[str], skill_list: list, threshold: float = 0.5
+) -> list[set]:
+    """``extract_semantic_skills`` for many texts with a single encode call."""
+    segments_per_text = [_split_segments(text) for text in texts]
+    all_segments = [seg for segments in segments_per_text for seg in segments]
+    if not all_segments:
+        return [set() for _ in texts]
+    return _detect_skills(segments_per_text, encode(all_segments).numpy(), skill_list, threshold)
+
+
+def _detect_skills(
+    segments_per_text: list[list[str]],
+    segment_embs: np.ndarray,
+    skill_list: list,
+    threshold: float = 0.5,
+) -> list[set]:
+    """Skills whose embedding is close to any segment of each text."""
+    if not len(segment_embs):
+        return [set() for _ in segments_per_text]
+
+    if skill_list == SKILL_KEYWORDS:
+        # Fixed vocabulary: use the precomputed store instead of re-encoding
+        skill_embs = torch.tensor(get_skill_embeddings())
+    else:
+        skill_embs = encode(skill_list)
 
-    # Split into meaningful sentences/segments
-    text_segments = [s.strip() for s in re.split(r"[.\n]", text) if len(s.strip()) > 10]
-    if not text_segments:
-        return set()
+    # Calculate all similarities at once: (num_segments, num_skills)
+    cos_sim_matrix = util.cos_sim(torch.from_numpy(np.asarray(segment_embs)), skill_embs)
 
-    detected_skills = set()
+    # For each text, a skill is present if it matches ANY of its segments
+    detected = []
+    offset = 0
+    for segments in segments_per_text:
+        if not segments:
+            detected.append(set())
+            continue
+        best = cos_sim_matrix[offset : offset + len(segments)].max(dim=0).values
+        offset += len(segments)
+        hit_idx = torch.nonzero(best >= threshold).flatten().tolist()
+        detected.append({skill_list[i] for i in hit_idx})
 
-    # Batch encode everything at once
-    segment_embs = embedding_model.encode(text_segments, convert_to_tensor=True, show_progress_bar=False)
-    skill_embs = embedding_model.encode(skill_list, convert_to_tensor=True, show_progress_bar=False)
+    return detected
 
-    # Calculate all similarities at once: (num_segments, num_skills)
-    cos_sim_matrix = util.cos_sim(segment_embs, skill_embs)
 
-    # For each skill, check if it matches ANY segment above the threshold
-    for skill_idx, skill_name in enumerate(skill_list):
-        max_sim = torch.max(cos_sim_matrix[:, skill_idx]).item()
-        if max_sim >= threshold:
-            detected_skills.add(skill_name)
+def get_embeddings(text: str):
+    return encode([text])[0].tolist()
 
-    return detected_skills
 
+def get_embeddings_batch(texts: list[str]) -> list:
+    return encode(texts).tolist()
 
 
-def get_embeddings(text: str):
-    emb = embedding_model.encode(text, convert_to_tensor=True, show_progress_bar=False)
-    return emb.tolist()
+def get_skill_embeddings_for(skills: list) -> list:
+    """Embed each skill name separately, for storing alongside the resume."""
+    if not skills:
+        return []
+    return encode(skills).tolist()
 
 
+def get_skill_embeddings_batch(skill_lists: list[list]) -> list[list]:
+    """``get_skill_embeddings_for`` for many skill lists in one encode call."""
+    flat = [skill for skills in skill_lists for skill in skills]
+    if not flat:
+        return [[] for _ in skill_lists]
+    vectors = encode(flat).tolist()
+    result, offset = [], 0
+    for skills in skill_lists:
+        result.append(vectors[offset : offset + len(skills)])
+        offset += len(skills)
+    return result
 
-def calculate_match(resume_text: str, resume_skills: list, jd_text: str, jd_skills: list):
+
+def _as_vector(value):
+    # pgvector columns come back from PostgREST as "[0.1,0.2,...]" strings
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value
+
+
+def stored_resume_embeddings(resume: dict):
+    """
+    Return ``(resume_embedding, skill_embeddings)`` from a resume row, or
+    ``(None, None)`` when they are missing or were made by another model.
+    """
+    if resume.get("embedding_model") != embedding_signature():
+        return None, None
+
+    resume_emb = _as_vector(resume.get("embeddings"))
+    skill_embs = _as_vector(resume.get("skill_embeddings"))
+    skills = resume.get("skills") or []
+    if not resume_emb or skill_embs is None or len(skill_embs) != len(skills):
+        return None, None
+    return resume_emb, skill_embs
+
+
+def calculate_match(
+    resume_text: str,
+    resume_skills: list,
+    jd_text: str,
+    jd_skills: list,
+    resume_embedding: list | None = None,
+    resume_skill_embeddings: list | None = None,
+    jd_embedding: list | None = None,
+):
     """
     Calculate similarity score and identify missing skills.
 
     Uses a two-pass approach:
     1. Exact match (case-insensitive) — fast and reliable
     2. Semantic similarity — catches synonyms and related terms
+
+    Pass the stored resume vectors (see ``stored_resume_embeddings``) and the
+    JD's ``DocumentAnalysis.embedding`` to skip re-encoding either document;
+    only the missing ones are encoded.
     """
-    resume_emb = embedding_model.encode(resume_text, convert_to_tensor=True, show_progress_bar=False)
-    jd_emb = embedding_model.encode(jd_text, convert_to_tensor=True, show_progress_bar=False)
+    to_encode = [t for t, emb in ((resume_text, resume_embedding), (jd_text, jd_embedding)) if emb is None]
+    encoded = iter(encode(to_encode)) if to_encode else iter(())
+    resume_emb = next(encoded) if resume_embedding is None else torch.as_tensor(resume_embedding, dtype=torch.float32)
+    jd_emb = next(encoded) if jd_embedding is None else torch.as_tensor(jd_embedding, dtype=torch.float32)
 
     similarity_score = util.cos_sim(resume_emb, jd_emb).item()
 
@@ -304,15 +592,13 @@ def calculate_match(resume_text: str, resume_skills: list, jd_text: str, jd_skil
 
         # Semantic check for skills not found by exact match
         if needs_semantic_check:
-            jd_skill_embs = embedding_model.encode(
-                needs_semantic_check, convert_to_tensor=True, show_progress_bar=False
-            )
+            jd_skill_embs = encode(needs_semantic_check)
 
             resume_skill_embs = None
-            if resume_skills:
-                resume_skill_embs = embedding_model.encode(
-                    resume_skills, convert_to_tensor=True, show_progress_bar=False
-                )
+            if resume_skills and resume_skill_embeddings:
+                resume_skill_embs = torch.tensor(resume_skill_embeddings, dtype=jd_emb.dtype)
+            elif resume_skills:
+                resume_skill_embs = encode(resume_skills)
 
             for i, jd_skill in enumerate(needs_semantic_check):
                 jd_skill_emb = jd_skill_embs[i:i+1]
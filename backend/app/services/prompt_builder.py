@@ -0,0 +1,217 @@
+"""Fit resume and job description text into a token budget for the LLM.
+
+Cutting at a fixed character count spends the context window on contact
+lines, page footers and whitespace, and can stop halfway through the
+experience section. Instead the text is cleaned (boilerplate and repeated
+lines dropped), split into sections, and packed line by line in order of
+value: the parsed skills and employers, then experience (most recent roles
+first, as resumes list them), then everything else. Generation time grows
+with prompt length, so the packed prompt is usually also faster.
+
+Token counts are estimates. Ollama has no tokenizer endpoint, so words are
+costed at roughly four characters per token, which is close to what
+Llama-family BPE vocabularies produce for English text.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+
+# Section headings, in packing priority order (lower packs first)
+SECTION_PRIORITY = {
+    "experience": 0,
+    "skills": 1,
+    "summary": 2,
+    "projects": 3,
+    "certifications": 4,
+    "education": 5,
+    "other": 6,
+}
+
+_SECTION_HEADINGS = {
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history",
+    ),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "tech stack"),
+    "summary": ("summary", "profile", "professional summary", "objective", "about me"),
+    "projects": ("projects", "personal projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses", "awards", "achievements"),
+    "education": ("education", "academic background", "qualifications"),
+    "other": ("interests", "hobbies", "references", "languages", "volunteering", "publications"),
+}
+_HEADING_TO_SECTION = {
+    heading: section for section, headings in _SECTION_HEADINGS.items() for heading in headings
+}
+
+_BOILERPLATE = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"^page \d+( of \d+)?$",
+        r"^references (are )?available (up)?on request\.?$",
+        r"^curriculum vitae$|^resume$|^r[ée]sum[ée]$",
+    )
+]
+
+# Contact details are checked a token at a time with flat patterns: one regex
+# over the whole line backtracks exponentially on long runs of digits
+_CONTACT_SEPARATORS = re.compile(r"[|•·,;]")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_URL = re.compile(r"(https?://|www\.)\S+")
+_PHONE_CHARS = re.compile(r"\+?[\d\s().-]+")
+_YEAR_RANGE = re.compile(r"\(?(19|20)\d\d\s*-\s*(19|20)\d\d\)?")
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate model tokens: ~4 characters per word piece, 1 per symbol."""
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_RE.findall(text))
+
+
+@dataclass
+class PackedText:
+    """Text trimmed to a budget, with its token accounting."""
+
+    text: str
+    tokens: int
+    original_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+def _is_phone(text: str) -> bool:
+    if not _PHONE_CHARS.fullmatch(text) or _YEAR_RANGE.fullmatch(text):
+        return False
+    return 7 <= sum(c.isdigit() for c in text) <= 15
+
+
+def _is_contact_line(line: str) -> bool:
+    """True for lines made only of emails, URLs and phone numbers."""
+    tokens = [token.strip() for token in _CONTACT_SEPARATORS.split(line)]
+    tokens = [token for token in tokens if token]
+    for token in tokens:
+        rest = " ".join(w for w in token.split() if not (_EMAIL.fullmatch(w) or _URL.fullmatch(w)))
+        if rest and not _is_phone(rest):
+            return False
+    return bool(tokens)
+
+
+def clean_lines(text: str) -> list[str]:
+    """Normalised non-empty lines, minus boilerplate and repeats.
+
+    Repeated lines are mostly page headers and footers from PDF extraction;
+    only the first occurrence is kept.
+    """
+    seen = set()
+    lines = []
+    for raw in _split_long_lines(text.splitlines()):
+        line = re.sub(r"\s+", " ", raw).strip(" \t•·-–—*|")
+        if len(line) < 2 or any(p.match(line) for p in _BOILERPLATE) or _is_contact_line(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _split_long_lines(lines: list[str], max_chars: int = 300):
+    # Some extractors return whole paragraphs (or the whole page) as one line
+    for line in lines:
+        if len(line) <= max_chars:
+            yield line
+        else:
+            yield from re.split(r"(?<=[.;!?])\s+", line)
+
+
+def _heading(line: str) -> str | None:
+    key = line.lower().rstrip(":").strip()
+    if len(key) > 40:
+        return None
+    return _HEADING_TO_SECTION.get(key)
+
+
+def split_sections(lines: list[str]) -> dict[str, list[str]]:
+    """Group cleaned lines under their section heading.
+
+    Text before the first recognised heading (name, headline, summary) is
+    treated as the summary.
+    """
+    sections: dict[str, list[str]] = {}
+    current = "summary"
+    for line in lines:
+        section = _heading(line)
+        if section is not None:
+            current = section
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _take_lines(lines: list[str], budget: int) -> tuple[list[str], int]:
+    taken, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1  # newline
+        if used + cost > budget:
+            # Keep the words of the last line that still fit, then stop
+            words, partial = [], 1
+            for word in line.split(" "):
+                word_cost = estimate_tokens(word)
+                if used + partial + word_cost > budget:
+                    break
+                words.append(word)
+                partial += word_cost
+            if words:
+                taken.append(" ".join(words))
+                used += partial
+            break
+        taken.append(line)
+        used += cost
+    return taken, used
+
+
+def pack_resume(resume_text: str, entities: dict | None, budget: int) -> PackedText:
+    """The resume's most useful content that fits within ``budget`` tokens."""
+    original_tokens = estimate_tokens(resume_text)
+    entities = entities or {}
+    blocks: list[tuple[str, list[str]]] = []
+    used = 0
+
+    # Parsed entities are dense and cheap, so they go first
+    parsed = []
+    for label, key in (("Detected skills", "skills"), ("Organisations", "experience")):
+        values = sorted({v for v in entities.get(key) or [] if v})
+        if not values:
+            continue
+        line = f"{label}: {', '.join(values)}"
+        cost = estimate_tokens(line) + 1
+        if used + cost <= budget:
+            parsed.append(line)
+            used += cost
+    if parsed:
+        blocks.append(("Parsed", parsed))
+
+    sections = split_sections(clean_lines(resume_text))
+    for section in sorted(sections, key=lambda s: SECTION_PRIORITY[s]):
+        heading_cost = estimate_tokens(section) + 2
+        if used + heading_cost >= budget:
+            break
+        # Lines keep document order, so experience keeps the latest roles
+        taken, cost = _take_lines(sections[section], budget - used - heading_cost)
+        if taken:
+            blocks.append((section.title(), taken))
+            used += heading_cost + cost
+
+    text = "\n\n".join(f"[{name}]\n" + "\n".join(lines) for name, lines in blocks)
+    return PackedText(text=text, tokens=estimate_tokens(text), original_tokens=original_tokens)
+
+
+def pack_text(text: str, budget: int) -> PackedText:
+    """Cleaned ``text`` cut at a line boundary within ``budget`` tokens."""
+    taken, _ = _take_lines(clean_lines(text), budget)
+    packed = "\n".join(taken)
+    return PackedText(text=packed, tokens=estimate_tokens(packed), original_tokens=estimate_tokens(text))
@@ -1,13 +1,23 @@
+import asyncio
+import io
 import os
 import re
-import tempfile
 import logging
-from typing import cast
+import zipfile
+from collections.abc import Awaitable, Callable
 from fastapi import UploadFile, HTTPException
 
 from app.core.config import settings
-from app.services import parser
+from app.core.security import generate_file_hash
+from app.services.executor import (
+    analyze_resume_text,
+    embed_skills,
+    parse_resume_texts,
+    parsing_executor,
+)
+from app.services.stats_cache import invalidate_stats
 from app.services.storage import upload_file as storage_upload
+from app.services.vector_index import get_resume_index
 from app.repositories.resume_repository import ResumeRepository
 from app.core.exceptions import AppException
 
@@ -31,57 +41,116 @@ ALLOWED_MIMES = {
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
 }
 
-class ResumeService:
-    def __init__(self, repository: ResumeRepository):
-        self.repository = repository
+ZIP_MIMES = {"application/zip", "application/x-zip-compressed"}
 
-    async def process_upload(self, file: UploadFile):
-        if not file.filename:
-             raise AppException(status_code=400, message="Filename is missing")
 
-        safe_filename = _sanitize_filename(file.filename)
-        if not safe_filename:
-            raise AppException(status_code=400, message="Invalid filename")
+def _validate_document(safe_filename: str, file_bytes: bytes) -> None:
+    """Size and magic-byte checks shared by single and batch uploads."""
+    # Reject oversized files before expensive magic-byte check
+    max_size = settings.max_upload_size_mb * 1024 * 1024
+    if len(file_bytes) > max_size:
+         raise AppException(status_code=413, message=f"File too large. Maximum size is {settings.max_upload_size_mb}MB")
 
-        if not safe_filename.lower().endswith((".pdf", ".docx")):
-            raise AppException(status_code=400, message="Only PDF or DOCX files allowed")
+    # Security: Validate magic bytes
+    import filetype
+    kind = filetype.guess(file_bytes)
+    if kind is None or kind.mime not in ALLOWED_MIMES:
+        raise AppException(status_code=400, message="Invalid file content (magic bytes mismatch)")
 
-        if file.content_type not in ALLOWED_MIMES:
-             raise AppException(status_code=400, message="Invalid file type")
 
-        file_bytes = await file.read()
+def _expand_zip(zip_bytes: bytes) -> list[tuple[str, bytes]]:
+    """Return ``(filename, bytes)`` for each PDF/DOCX inside a zip archive."""
+    max_size = settings.max_upload_size_mb * 1024 * 1024
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(zip_bytes))
+    except zipfile.BadZipFile as e:
+        raise AppException(status_code=400, message="Invalid zip archive") from e
 
-        # Reject oversized files before expensive magic-byte check
-        max_size = settings.max_upload_size_mb * 1024 * 1024
-        if len(file_bytes) > max_size:
-             raise AppException(status_code=413, message=f"File too large. Maximum size is {settings.max_upload_size_mb}MB")
+    documents = []
+    with archive:
+        for info in archive.infolist():
+            name = _sanitize_filename(info.filename)
+            if info.is_dir() or not name.lower().endswith((".pdf", ".docx")):
+                continue
+            if len(documents) >= settings.batch_upload_max_files:
+                raise AppException(status_code=413, message=f"Too many files. Maximum is {settings.batch_upload_max_files}")
+            # Check the declared size before inflating anything (zip bombs)
+            if info.file_size > max_size:
+                raise AppException(status_code=413, message=f"{name} is too large. Maximum size is {settings.max_upload_size_mb}MB")
+            documents.append((name, archive.read(info)))
+    return documents
 
-        # Security: Validate magic bytes
-        import filetype
-        kind = filetype.guess(file_bytes)
-        if kind is None or kind.mime not in ALLOWED_MIMES:
-            raise AppException(status_code=400, message="Invalid file content (magic bytes mismatch)")
+def validate_upload(filename: str | None, content_type: str | None, file_bytes: bytes) -> str:
+    """Run every upload check; returns the sanitized filename."""
+    if not filename:
+         raise AppException(status_code=400, message="Filename is missing")
 
-        # Storage Upload
-        file_url = None
-        try:
-            file_url = storage_upload(file_bytes, safe_filename)
-        except RuntimeError as e:
-            logger.warning(f"Storage upload failed: {e}")
+    safe_filename = _sanitize_filename(filename)
+    if not safe_filename:
+        raise AppException(status_code=400, message="Invalid filename")
 
-        # Processing
-        ext = safe_filename.rsplit(".", 1)[-1] if "." in safe_filename else "bin"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{ext}", mode="wb") as tmp:
-            tmp.write(cast(bytes, file_bytes))
-            tmp_path = tmp.name
+    if not safe_filename.lower().endswith((".pdf", ".docx")):
+        raise AppException(status_code=400, message="Only PDF or DOCX files allowed")
 
-        try:
-            text = parser.extract_text(tmp_path)
-        finally:
-            os.unlink(tmp_path)
+    if content_type not in ALLOWED_MIMES:
+         raise AppException(status_code=400, message="Invalid file type")
+
+    _validate_document(safe_filename, file_bytes)
+    return safe_filename
 
-        entities = parser.extract_entities(text)
-        embeddings = parser.get_embeddings(text)
+
+async def _no_progress(stage: str) -> None:
+    pass
+
+
+class ResumeService:
+    def __init__(self, repository: ResumeRepository):
+        self.repository = repository
+
+    async def process_upload(self, file: UploadFile, force_reparse: bool = False):
+        return await self.process_document(
+            file.filename, file.content_type, await file.read(), force_reparse=force_reparse
+        )
+
+    async def process_document(
+        self,
+        filename: str | None,
+        content_type: str | None,
+        file_bytes: bytes,
+        force_reparse: bool = False,
+        progress: Callable[[str], Awaitable[None]] | None = None,
+    ):
+        """
+        Validate, parse and store one uploaded resume.
+
+        ``progress`` is awaited with each stage name as it starts ("extract",
+        "analyze" for entities and the document vector, "skills" for the
+        per-skill vectors, "store"), for background jobs to report.
+        """
+        report = progress or _no_progress
+        safe_filename = validate_upload(filename, content_type, file_bytes)
+
+        # Content-addressed dedupe: identical bytes were already parsed
+        file_hash = generate_file_hash(file_bytes)
+        existing = await self.repository.get_by_file_hash(file_hash)
+        if existing and not force_reparse:
+            return {**existing, "duplicate": True}
+
+        # Storage Upload (a forced re-parse keeps the already stored file)
+        file_url = existing.get("file_url") if existing else None
+        if not file_url:
+            # Storage still goes through the sync client, so keep it off the loop
+            file_url = await asyncio.to_thread(self._store_file, file_bytes, safe_filename)
+
+        # Processing (off the event loop); large PDFs fan out by page range
+        ext = safe_filename.rsplit(".", 1)[-1] if "." in safe_filename else "bin"
+        await report("extract")
+        text = await parsing_executor.extract_text(file_bytes, ext)
+        await report("analyze")
+        parsed = await parsing_executor.run(analyze_resume_text, text)
+        entities = parsed["entities"]
+        await report("skills")
+        skill_embeddings = await parsing_executor.run(embed_skills, entities.get("skills", []))
 
         resume_data = {
             "filename": safe_filename,
@@ -89,25 +158,199 @@ class ResumeService:
             "skills": entities.get("skills", []),
             "education": entities.get("education", []),
             "experience": entities.get("experience", []),
-            "embeddings": embeddings,
+            "embeddings": parsed["embeddings"],
+            "skill_embeddings": skill_embeddings,
+            "embedding_model": parsed["embedding_model"],
             "file_url": file_url,
+            "file_hash": file_hash,
+        }
+
+        await report("store")
+        if existing:
+            resume = await self.repository.update(existing["id"], resume_data)
+        else:
+            resume = await self.repository.create(resume_data)
+            await invalidate_stats()
+        get_resume_index().add(resume["id"], resume_data["embeddings"])
+        return resume
+
+    async def process_batch(self, files: list[UploadFile]) -> dict:
+        """
+        Parse many resumes (PDF/DOCX files or zips of them) in one request.
+
+        Text extraction fans out across the parsing pool per file; NER and
+        embedding then run in chunks through ``nlp.pipe`` and batched encode
+        calls, and all new rows are written with a single bulk insert. Files
+        are reported individually, so one bad file doesn't fail the batch.
+        """
+        if len(files) > settings.batch_upload_max_files:
+            raise AppException(status_code=413, message=f"Too many files. Maximum is {settings.batch_upload_max_files}")
+
+        items: list[dict] = []
+        documents: list[dict] = []
+
+        def add_item(filename: str, error: str | None = None) -> dict:
+            item = {"filename": filename, "status": "error" if error else "pending", "id": None, "error": error}
+            items.append(item)
+            return item
+
+        for upload in files:
+            safe_filename = _sanitize_filename(upload.filename or "")
+            file_bytes = await upload.read()
+            try:
+                if upload.content_type in ZIP_MIMES or safe_filename.lower().endswith(".zip"):
+                    entries = _expand_zip(file_bytes)
+                else:
+                    entries = [(safe_filename, file_bytes)]
+            except AppException as e:
+                add_item(safe_filename, e.message)
+                continue
+
+            for name, data in entries:
+                if not name.lower().endswith((".pdf", ".docx")):
+                    add_item(name, "Only PDF or DOCX files allowed")
+                    continue
+                try:
+                    _validate_document(name, data)
+                except AppException as e:
+                    add_item(name, e.message)
+                    continue
+                documents.append({
+                    "item": add_item(name),
+                    "filename": name,
+                    "data": data,
+                    "file_hash": generate_file_hash(data),
+                })
+
+        if len(items) > settings.batch_upload_max_files:
+            raise AppException(status_code=413, message=f"Too many files. Maximum is {settings.batch_upload_max_files}")
+
+        # Dedupe against stored resumes and within the batch itself
+        existing = await self.repository.get_by_file_hashes(list({d["file_hash"] for d in documents}))
+        first_by_hash: dict[str, dict] = {}
+        to_parse: list[dict] = []
+        for doc in documents:
+            if doc["file_hash"] in existing:
+                doc["item"].update(status="duplicate", id=existing[doc["file_hash"]]["id"])
+            elif doc["file_hash"] in first_by_hash:
+                doc["item"]["status"] = "duplicate"
+            else:
+                first_by_hash[doc["file_hash"]] = doc["item"]
+                to_parse.append(doc)
+
+        # Extract text from every file in parallel across the pool
+        extracted = await asyncio.gather(
+            *(
+                parsing_executor.extract_text(doc["data"], doc["filename"].rsplit(".", 1)[-1])
+                for doc in to_parse
+            ),
+            return_exceptions=True,
+        )
+        ready = []
+        for doc, text in zip(to_parse, extracted, strict=True):
+            if isinstance(text, Exception):
+                logger.warning(f"Text extraction failed for {doc['filename']!r}: {text}")
+                doc["item"].update(status="error", error="Could not extract text from file")
+            else:
+                ready.append({**doc, "text": text})
+
+        # Batched NER + embeddings, chunked so several workers share the load
+        chunk = max(1, settings.batch_parse_chunk_size)
+        parsed_chunks = await asyncio.gather(
+            *(self._parse_texts(ready[i : i + chunk]) for i in range(0, len(ready), chunk))
+        )
+        parsed = []
+        for doc, result in zip(ready, (r for c in parsed_chunks for r in c), strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Parsing failed for {doc['filename']!r}: {result}")
+                doc["item"].update(status="error", error="Could not parse file")
+            else:
+                parsed.append((doc, result))
+
+        file_urls = await asyncio.gather(
+            *(asyncio.to_thread(self._store_file, doc["data"], doc["filename"]) for doc, _ in parsed),
+            return_exceptions=True,
+        )
+
+        stored, rows = [], []
+        for (doc, result), file_url in zip(parsed, file_urls, strict=True):
+            if isinstance(file_url, Exception):
+                logger.warning(f"Storing {doc['filename']!r} failed: {file_url}")
+                doc["item"].update(status="error", error="Could not store file")
+                continue
+            entities = result["entities"]
+            stored.append(doc)
+            rows.append({
+                "filename": doc["filename"],
+                "text": doc["text"],
+                "skills": entities.get("skills", []),
+                "education": entities.get("education", []),
+                "experience": entities.get("experience", []),
+                "embeddings": result["embeddings"],
+                "skill_embeddings": result["skill_embeddings"],
+                "embedding_model": result["embedding_model"],
+                "file_url": file_url,
+                "file_hash": doc["file_hash"],
+            })
+
+        created = await self.repository.create_many(rows) if rows else []
+        if created:
+            await invalidate_stats()
+        index = get_resume_index()
+        for doc, row, data in zip(stored, created, rows, strict=True):
+            doc["item"].update(status="created", id=row["id"])
+            index.add(row["id"], data["embeddings"])
+
+        # Repeats within the batch share the outcome of the first copy
+        for doc in documents:
+            first = first_by_hash.get(doc["file_hash"])
+            if first is not None and first is not doc["item"]:
+                doc["item"].update(status="duplicate" if first["id"] else first["status"], id=first["id"], error=first["error"])
+
+        return {
+            "total": len(items),
+            "created": sum(1 for i in items if i["status"] == "created"),
+            "duplicates": sum(1 for i in items if i["status"] == "duplicate"),
+            "failed": sum(1 for i in items if i["status"] == "error"),
+            "items": items,
         }
 
-        return self.repository.create(resume_data)
+    async def _parse_texts(self, docs: list[dict]) -> list:
+        """Parse results for ``docs`` in one batch, or the exception per document.
+
+        When a batch fails its documents are retried one by one, so only the
+        file that broke it is reported as an error.
+        """
+        try:
+            return await parsing_executor.run(parse_resume_texts, [doc["text"] for doc in docs])
+        except Exception as e:
+            if len(docs) == 1:
+                return [e]
+            singles = await asyncio.gather(*(self._parse_texts([doc]) for doc in docs))
+            return [results[0] for results in singles]
+
+    @staticmethod
+    def _store_file(file_bytes: bytes, filename: str) -> str | None:
+        try:
+            return storage_upload(file_bytes, filename)
+        except RuntimeError as e:
+            logger.warning(f"Storage upload failed: {e}")
+            return None
 
-    def get_resume(self, resume_id: int):
-        resume = self.repository.get_by_id(resume_id)
+    async def get_resume(self, resume_id: int):
+        resume = await self.repository.get_by_id(resume_id)
         if not resume:
             raise AppException(status_code=404, message="Resume not found")
         return resume
 
-    def list_resumes(self, limit: int, offset: int):
-        return self.repository.get_all(limit, offset)
+    async def list_resumes(self, limit: int, offset: int):
+        return await self.repository.get_all(limit, offset)
 
-    def delete_resume(self, resume_id: int):
-        if not self.repository.get_by_id(resume_id):
+    async def delete_resume(self, resume_id: int):
+        if not await self.repository.get_by_id(resume_id):
             raise AppException(status_code=404, message="Resume not found")
-        return self.repository.delete(resume_id)
-    
-    def get_count(self):
-        return self.repository.count()
+        deleted = await self.repository.delete(resume_id)
+        # Deleting a resume also deletes its matches
+        await invalidate_stats()
+        get_resume_index().remove(resume_id)
+        return deleted
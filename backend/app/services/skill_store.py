@@ -0,0 +1,67 @@
+"""Persisted embedding matrix for the fixed skill vocabulary.
+
+The skill list only changes when the code changes, so its embeddings are
+computed once, saved as a float32 ``.npy`` matrix and memory-mapped on load.
+The file name carries the model name and a hash of the vocabulary, so a new
+model or an edited ``SKILL_KEYWORDS`` list simply misses and triggers a
+rebuild.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def vocabulary_hash(vocabulary: list[str]) -> str:
+    """Stable short hash of an ordered vocabulary."""
+    digest = hashlib.sha256("\n".join(vocabulary).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class SkillEmbeddingStore:
+    """On-disk ``(len(vocabulary), dim)`` embedding matrix for one model."""
+
+    def __init__(self, cache_dir: str, model_name: str, vocabulary: list[str]):
+        self.model_name = model_name
+        self.vocabulary = list(vocabulary)
+        model_slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.path = (
+            Path(cache_dir)
+            / "skill_embeddings"
+            / f"{model_slug}-{vocabulary_hash(self.vocabulary)}.npy"
+        )
+
+    def load(self, encode: Callable[[list[str]], np.ndarray]) -> np.ndarray:
+        """Memory-map the stored matrix, building it with ``encode`` if missing."""
+        if self.path.exists():
+            try:
+                matrix = np.load(self.path, mmap_mode="r")
+                if matrix.shape[0] == len(self.vocabulary):
+                    return matrix
+                logger.warning(f"Skill embedding store {self.path} has wrong shape")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skill embedding store {self.path} unreadable: {e}")
+
+        self._build(encode)
+        return np.load(self.path, mmap_mode="r")
+
+    def _build(self, encode: Callable[[list[str]], np.ndarray]) -> None:
+        logger.info(
+            f"Building skill embedding store for {len(self.vocabulary)} skills "
+            f"({self.model_name})"
+        )
+        matrix = np.asarray(encode(self.vocabulary), dtype=np.float32)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename so concurrent parser processes never see a torn file
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,142 @@
+"""Small result cache shared by every worker process on the host.
+
+Entries live in a SQLite file under ``cache_dir``, so the gunicorn workers
+see one copy instead of each recomputing its own. Writers invalidate an
+entry explicitly (write-through), which also bumps its generation: a value
+computed before the invalidation is then refused when it is stored, so a
+slow recompute can't put stale numbers back.
+
+When an entry is missing or expired, only the worker that takes the entry's
+lease recomputes it. The others keep serving the expired value if there is
+one, or wait briefly for the leaseholder's result.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.local_store import open_sqlite
+
+STATS_KEY = "stats"
+
+
+class SharedCache:
+    """JSON values with a TTL, invalidation and a recompute lease per key."""
+
+    def __init__(self, path: str | Path, ttl_seconds: float, lease_seconds: float = 10.0):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL DEFAULT 0, "
+            "generation INTEGER NOT NULL DEFAULT 0, lease_holder TEXT, lease_until REAL NOT NULL DEFAULT 0)"
+        )
+
+    # ── Entries ──────────────────────────────────────────────────────────────
+
+    def read(self, key: str) -> tuple[object | None, bool, int]:
+        """``(value, fresh, generation)``; ``value`` is ``None`` when absent."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at, generation FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None, False, 0
+        value, expires_at, generation = row
+        if value is None:
+            return None, False, generation
+        return json.loads(value), expires_at > time.time(), generation
+
+    def store(self, key: str, value, generation: int) -> bool:
+        """Store ``value`` unless the entry was invalidated since ``generation``."""
+        with self._lock:
+            row = self._db.execute(
+                "INSERT INTO entries (key, value, expires_at, generation) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE entries.generation = excluded.generation "
+                "RETURNING key",
+                (key, json.dumps(value), time.time() + self.ttl_seconds, generation),
+            ).fetchone()
+        return row is not None
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO entries (key, value, expires_at, generation) VALUES (?, NULL, 0, 1) "
+                "ON CONFLICT (key) DO UPDATE SET value = NULL, expires_at = 0, "
+                "generation = entries.generation + 1",
+                (key,),
+            )
+
+    # ── Recompute lease ──────────────────────────────────────────────────────
+
+    def acquire_lease(self, key: str) -> str | None:
+        """Take the right to recompute ``key``; returns a token, or ``None`` if held.
+
+        A lease that outlived ``lease_seconds`` (its holder crashed) can be
+        taken over.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._lock:
+            row = self._db.execute(
+                "INSERT INTO entries (key, lease_holder, lease_until) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET lease_holder = excluded.lease_holder, "
+                "lease_until = excluded.lease_until "
+                "WHERE entries.lease_until < ? "
+                "RETURNING key",
+                (key, token, now + self.lease_seconds, now),
+            ).fetchone()
+        return token if row is not None else None
+
+    def release_lease(self, key: str, token: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET lease_holder = NULL, lease_until = 0 WHERE key = ? AND lease_holder = ?",
+                (key, token),
+            )
+
+    # ── Async front door ─────────────────────────────────────────────────────
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[object]]):
+        """The cached value for ``key``, recomputing it in at most one worker."""
+        deadline = time.monotonic() + self.lease_seconds
+        while True:
+            value, fresh, generation = await asyncio.to_thread(self.read, key)
+            if fresh:
+                return value
+            token = await asyncio.to_thread(self.acquire_lease, key)
+            if token is not None:
+                try:
+                    # The previous leaseholder may have just stored it
+                    value, fresh, generation = await asyncio.to_thread(self.read, key)
+                    if not fresh:
+                        value = await compute()
+                        await asyncio.to_thread(self.store, key, value, generation)
+                    return value
+                finally:
+                    await asyncio.to_thread(self.release_lease, key, token)
+            # Someone else is recomputing: an expired value beats waiting
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                return await compute()
+            await asyncio.sleep(0.05)
+
+
+@lru_cache(maxsize=1)
+def get_stats_cache() -> SharedCache:
+    return SharedCache(Path(settings.cache_dir) / "stats.sqlite3", settings.stats_cache_ttl_seconds)
+
+
+async def invalidate_stats() -> None:
+    """Drop the cached dashboard stats; call after every write they count."""
+    await asyncio.to_thread(get_stats_cache().invalidate, STATS_KEY)
@@ -0,0 +1,405 @@
+"""Similarity indexes over stored embeddings (resumes and job descriptions).
+
+Every row vector made with the current embedding signature is held as one
+L2-normalised float32 matrix. ``VectorIndex`` scans all of it (exact; a few
+milliseconds for tens of thousands of rows). ``IVFVectorIndex`` adds an
+inverted-file layer: vectors are clustered with k-means and a query only
+scores the rows in its ``nprobe`` nearest clusters, which keeps latency flat
+into the hundreds of thousands at a small recall cost.
+
+Indexes are per worker process. Writes handled by the worker update it
+directly, and a periodic ``sync`` against the database picks up changes made
+elsewhere. A snapshot is saved to disk after syncs that changed something, so
+a restart loads the snapshot and only fetches the delta — and a crash between
+snapshot and DB write is repaired by that same sync.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def to_vector(value) -> np.ndarray | None:
+    """Coerce a stored embedding (list or pgvector string) to float32."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    vector = np.asarray(value, dtype=np.float32)
+    return vector if vector.ndim == 1 and vector.size else None
+
+
+class VectorIndex:
+    """Exact cosine top-k over a growable, normalised vector matrix."""
+
+    kind = "exact"
+
+    def __init__(self, signature: str, path: str | Path | None = None, name: str = "Vector"):
+        self.signature = signature
+        self.name = name
+        self.path = Path(path) if path is not None else None
+        self.loaded = False
+        self.synced_at = 0.0
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._rows: dict[int, int] = {}
+        self._size = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def ids(self) -> set[int]:
+        with self._lock:
+            return set(self._rows)
+
+    # ── Mutation ──────────────────────────────────────────────────────────────
+
+    def add(self, resume_id: int, vector) -> None:
+        """Insert or replace one resume vector."""
+        vec = to_vector(vector)
+        if vec is None:
+            return
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            return
+        vec = vec / norm
+
+        with self._lock:
+            if self._size and vec.shape[0] != self._matrix.shape[1]:
+                logger.warning(f"Ignoring resume {resume_id}: vector dim {vec.shape[0]} != index dim")
+                return
+            row = self._rows.get(resume_id)
+            if row is None:
+                row = self._size
+                self._grow(row + 1, vec.shape[0])
+                self._rows[resume_id] = row
+                self._ids[row] = resume_id
+                self._size += 1
+            self._matrix[row] = vec
+            self._on_set(row, vec)
+            self._dirty = True
+
+    def remove(self, resume_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(resume_id, None)
+            if row is None:
+                return
+            last = self._size - 1
+            if row != last:
+                # Move the last row into the hole to keep the matrix dense
+                self._matrix[row] = self._matrix[last]
+                moved_id = int(self._ids[last])
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+                self._on_move(last, row)
+            self._size = last
+            self._dirty = True
+
+    # Hooks for subclasses that keep per-row state alongside the matrix
+    def _on_set(self, row: int, vec: np.ndarray) -> None:
+        pass
+
+    def _on_move(self, src: int, dst: int) -> None:
+        pass
+
+    def _grow(self, needed: int, dim: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity and self._matrix.shape[1] == dim:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        matrix = np.zeros((new_capacity, dim), dtype=np.float32)
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        if self._size:
+            matrix[: self._size] = self._matrix[: self._size]
+            ids[: self._size] = self._ids[: self._size]
+        self._matrix, self._ids = matrix, ids
+
+    # ── Query ────────────────────────────────────────────────────────────────
+
+    def search(self, query, k: int) -> list[tuple[int, float]]:
+        """Return up to ``k`` ``(resume_id, cosine)`` pairs, best first."""
+        vec = to_vector(query)
+        if vec is None:
+            return []
+        vec = vec / (np.linalg.norm(vec) or 1.0)
+
+        with self._lock:
+            if not self._size or k <= 0 or vec.shape[0] != self._matrix.shape[1]:
+                return []
+            rows = self._candidate_rows(vec, k)
+            if rows is None:
+                scores = self._matrix[: self._size] @ vec
+                ids = self._ids[: self._size]
+            else:
+                scores = self._matrix[rows] @ vec
+                ids = self._ids[rows]
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def _candidate_rows(self, vec: np.ndarray, k: int) -> np.ndarray | None:
+        """Rows worth scoring for ``vec``; ``None`` means all of them."""
+        return None
+
+    # ── Database sync ────────────────────────────────────────────────────────
+
+    async def sync(self, list_ids, fetch_embeddings) -> None:
+        """
+        Reconcile with the database: load vectors for rows the index lacks and
+        drop ids that no longer exist. Only ids are listed up front, so a sync
+        where nothing changed transfers no vectors.
+
+        ``list_ids(signature)`` is awaited for the ids stored with this
+        signature and ``fetch_embeddings(ids)`` is an async iterator of
+        ``{"id", "embeddings"}`` rows.
+        """
+        stored_ids = set(await list_ids(self.signature))
+        known = self.ids()
+        missing = stored_ids - known
+        async for row in fetch_embeddings(list(missing)):
+            self.add(row["id"], row.get("embeddings"))
+        for resume_id in known - stored_ids:
+            self.remove(resume_id)
+
+        self.loaded = True
+        self.synced_at = time.monotonic()
+        if missing or known - stored_ids:
+            logger.info(
+                f"{self.name} index synced: +{len(missing)} / -{len(known - stored_ids)} "
+                f"({self._size} vectors)"
+            )
+        # Re-clustering and the snapshot write are too slow for the event loop
+        await asyncio.to_thread(self._after_sync)
+
+    def _after_sync(self) -> None:
+        self.maintain()
+        if self._dirty:
+            self.save()
+
+    def needs_sync(self, max_age_seconds: float) -> bool:
+        return not self.loaded or time.monotonic() - self.synced_at > max_age_seconds
+
+    def maintain(self) -> None:
+        """Periodic upkeep run after a sync (e.g. re-clustering)."""
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def _state(self) -> dict[str, np.ndarray]:
+        return {
+            "ids": self._ids[: self._size].copy(),
+            "matrix": self._matrix[: self._size].copy(),
+        }
+
+    def _restore(self, state) -> None:
+        ids, matrix = state["ids"], state["matrix"]
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._rows = {int(resume_id): row for row, resume_id in enumerate(self._ids)}
+        self._size = len(self._ids)
+
+    def save(self) -> None:
+        """Atomically write a snapshot to ``self.path`` (if set)."""
+        if self.path is None:
+            return
+        with self._lock:
+            state = self._state()
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, kind=np.array(self.kind), signature=np.array(self.signature), **state)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """Load the snapshot at ``self.path``; False if absent or incompatible."""
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with np.load(self.path) as state:
+                if str(state["kind"]) != self.kind or str(state["signature"]) != self.signature:
+                    return False
+                with self._lock:
+                    self._restore(state)
+                    self._dirty = False
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable index snapshot {self.path}: {e}")
+            return False
+        logger.info(f"Loaded {self.name} index snapshot ({self._size} vectors)")
+        return True
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    Inverted-file approximate index: spherical k-means centroids partition the
+    vectors, and a query scores only the rows in its ``nprobe`` closest
+    partitions. Below ``min_train_size`` vectors it behaves exactly like the
+    exact index.
+    """
+
+    kind = "ivf"
+
+    def __init__(
+        self,
+        signature: str,
+        path: str | Path | None = None,
+        name: str = "Vector",
+        nlist: int = 0,
+        nprobe: int = 8,
+        min_train_size: int = 4096,
+    ):
+        super().__init__(signature, path, name)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self._centroids: np.ndarray | None = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def _grow(self, needed: int, dim: int) -> None:
+        super()._grow(needed, dim)
+        if len(self._assign) < self._matrix.shape[0]:
+            assign = np.full(self._matrix.shape[0], -1, dtype=np.int32)
+            assign[: len(self._assign)] = self._assign
+            self._assign = assign
+
+    def _on_set(self, row: int, vec: np.ndarray) -> None:
+        self._assign[row] = int(np.argmax(self._centroids @ vec)) if self.trained else -1
+
+    def _on_move(self, src: int, dst: int) -> None:
+        self._assign[dst] = self._assign[src]
+
+    def _candidate_rows(self, vec: np.ndarray, k: int) -> np.ndarray | None:
+        if not self.trained:
+            return None
+        nprobe = min(self.nprobe, len(self._centroids))
+        probe = np.argpartition(-(self._centroids @ vec), nprobe - 1)[:nprobe]
+        rows = np.flatnonzero(np.isin(self._assign[: self._size], probe))
+        # Too few candidates to fill k: fall back to the exact scan
+        return rows if len(rows) >= k else None
+
+    def maintain(self) -> None:
+        # (Re)cluster once big enough, and again whenever the corpus has grown 4x
+        if self._size >= self.min_train_size and self._size >= 4 * self._trained_size:
+            self.train()
+
+    def train(self, iterations: int = 10, sample_size: int = 65536, seed: int = 0) -> None:
+        with self._lock:
+            data = self._matrix[: self._size].copy()
+        if not len(data):
+            return
+
+        nlist = self.nlist or int(4 * np.sqrt(len(data)))
+        nlist = max(1, min(nlist, len(data)))
+        rng = np.random.default_rng(seed)
+        sample = data[rng.choice(len(data), size=min(sample_size, len(data)), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = _nearest(sample, centroids)
+            # Per-cluster sums via sort + reduceat (np.add.at is far slower)
+            order = np.argsort(labels, kind="stable")
+            sorted_labels = labels[order]
+            starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+            sums = np.zeros_like(centroids)
+            sums[sorted_labels[starts]] = np.add.reduceat(sample[order], starts, axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        with self._lock:
+            self._centroids = centroids.astype(np.float32)
+            self._assign[: self._size] = _nearest(self._matrix[: self._size], self._centroids)
+            self._trained_size = self._size
+            self._dirty = True
+        logger.info(f"Trained IVF {self.name} index: {nlist} lists over {self._size} vectors")
+
+    def _state(self) -> dict[str, np.ndarray]:
+        state = super()._state()
+        state["assign"] = self._assign[: self._size].copy()
+        state["trained_size"] = np.array(self._trained_size)
+        if self._centroids is not None:
+            state["centroids"] = self._centroids
+        return state
+
+    def _restore(self, state) -> None:
+        super()._restore(state)
+        self._assign = np.asarray(state["assign"], dtype=np.int32)
+        self._trained_size = int(state["trained_size"])
+        self._centroids = state.get("centroids")
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    """Index of the most similar centroid for each vector, in bounded memory."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for i in range(0, len(vectors), chunk):
+        labels[i : i + chunk] = np.argmax(vectors[i : i + chunk] @ centroids.T, axis=1)
+    return labels
+
+
+def recall_at_k(index: VectorIndex, exact: VectorIndex, queries, k: int) -> float:
+    """Mean fraction of the exact top-k that ``index`` also returns."""
+    if not len(queries):
+        return 1.0
+    total = 0.0
+    for query in queries:
+        truth = {resume_id for resume_id, _ in exact.search(query, k)}
+        found = {resume_id for resume_id, _ in index.search(query, k)}
+        total += len(truth & found) / max(1, len(truth))
+    return total / len(queries)
+
+
+def create_index(
+    backend: str, signature: str, path: str | Path | None = None, name: str = "Vector", **options
+):
+    """Build an empty index for ``backend`` ("exact" or "ivf")."""
+    if backend == "ivf":
+        return IVFVectorIndex(signature, path, name, **options)
+    return VectorIndex(signature, path, name)
+
+
+def _create_configured_index(name: str) -> VectorIndex:
+    from app.core.config import settings
+    from app.services.parser import embedding_signature
+
+    backend = settings.vector_index_backend
+    options = {}
+    if backend == "ivf":
+        options = {"nlist": settings.vector_index_nlist, "nprobe": settings.vector_index_nprobe}
+    index = create_index(
+        backend,
+        embedding_signature(),
+        Path(settings.cache_dir) / f"{name.lower()}_index_{backend}.npz",
+        name,
+        **options,
+    )
+    # The snapshot may lag the DB (or predate a crash); the first sync repairs it
+    index.load()
+    return index
+
+
+@lru_cache(maxsize=1)
+def get_resume_index() -> VectorIndex:
+    """This worker's resume index, warm-started from the on-disk snapshot."""
+    return _create_configured_index("Resume")
+
+
+@lru_cache(maxsize=1)
+def get_job_index() -> VectorIndex:
+    """This worker's job-description index, warm-started from its snapshot."""
+    return _create_configured_index("Job")
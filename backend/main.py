@@ -13,7 +13,11 @@ from slowapi.errors import RateLimitExceeded
 from app.core.config import settings
 from app.core.exceptions import AppException
 from app.core.rate_limit import limiter
-from app.routers import resumes, matches
+from app.database.database import close_async_db, get_async_db
+from app.routers import jobs, resumes, matches
+from app.services.executor import parsing_executor
+from app.services.jobs import job_runner
+from app.services.ollama_client import ollama_client
 
 logging.basicConfig(level=logging.INFO)
 
@@ -25,7 +29,15 @@ async def lifespan(app: FastAPI):
     logging.info(f"Starting {settings.app_name} in {settings.app_env} mode")
     if settings.debug:
         logging.info(f"Supabase URL: {settings.supabase_url}")
+    parsing_executor.start()
+    ollama_client.start()
+    ollama_client.start_monitor()
+    job_runner.start()
     yield
+    await job_runner.stop()
+    await ollama_client.aclose()
+    await close_async_db()
+    parsing_executor.shutdown()
     logging.info("Shutting down gracefully")
 
 
@@ -47,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", "X-API-Key"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -110,8 +123,7 @@ async def health_check(request: Request):
     supabase_status = "unknown"
     supabase_error = None
     try:
-        from app.database.database import supabase as sb_client
-        sb_client.table("resumes").select("id").limit(1).execute()
+        await get_async_db().table("resumes").select("id").limit(1).execute()
         supabase_status = "connected"
     except Exception as e:
         supabase_status = "error"
@@ -128,3 +140,4 @@ async def health_check(request: Request):
 
 app.include_router(resumes.router, prefix="/resume", tags=["Resumes"])
 app.include_router(matches.router, prefix="/resume", tags=["Matches"])
+app.include_router(jobs.router, prefix="/resume", tags=["Jobs"])
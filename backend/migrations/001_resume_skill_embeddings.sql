@@ -0,0 +1,4 @@
+-- Per-skill vectors and the model signature they were computed with, so
+-- /resume/match can reuse stored vectors instead of re-encoding the resume.
+alter table resumes add column if not exists skill_embeddings jsonb;
+alter table resumes add column if not exists embedding_model text;
@@ -0,0 +1,4 @@
+-- SHA-256 of the uploaded bytes, so re-uploads of the same file can return
+-- the existing parse result instead of parsing it again.
+alter table resumes add column if not exists file_hash text;
+create index if not exists resumes_file_hash_idx on resumes (file_hash);
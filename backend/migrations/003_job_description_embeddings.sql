@@ -0,0 +1,5 @@
+-- Document vectors for stored job descriptions, so /resume/resume/{id}/jobs
+-- can rank them for a resume without re-encoding every description.
+alter table job_descriptions add column if not exists embeddings jsonb;
+alter table job_descriptions add column if not exists embedding_model text;
+create index if not exists job_descriptions_embedding_model_idx on job_descriptions (embedding_model);
@@ -0,0 +1,4 @@
+-- Keyset pagination for /resume/matches walks (created_at, id) newest first,
+-- optionally within one resume.
+create index if not exists matches_created_at_id_idx on matches (created_at desc, id desc);
+create index if not exists matches_resume_created_at_id_idx on matches (resume_id, created_at desc, id desc);
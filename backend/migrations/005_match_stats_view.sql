@@ -0,0 +1,21 @@
+-- Dashboard stats for /resume/stats, aggregated in the database so the API
+-- reads one row instead of every match_score. The select sticks to SQL that
+-- SQLite also understands: app/database/local_stats.py runs this same view
+-- offline.
+create or replace view match_stats as
+select
+    (select count(*) from resumes) as total_resumes,
+    count(*) as total_matches,
+    coalesce(round(cast(avg(match_score) as numeric), 1), 0) as avg_score,
+    coalesce(
+        round(
+            cast(
+                100.0 * sum(case when match_score >= 70 then 1 else 0 end)
+                / nullif(count(match_score), 0)
+                as numeric
+            ),
+            1
+        ),
+        0
+    ) as success_rate
+from matches;
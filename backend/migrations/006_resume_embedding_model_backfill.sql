@@ -0,0 +1,10 @@
+-- Resumes stored before 001 have document vectors but no embedding_model, so
+-- top-k search (which only indexes rows made with the current signature)
+-- skipped them. Their vectors came from the default model with the same
+-- whole-text encoding, so label them with its signature. Deployments that
+-- ran with a different EMBEDDING_MODEL should substitute its signature
+-- ("<model>:v1") before running this.
+update resumes
+set embedding_model = 'all-MiniLM-L6-v2:v1'
+where embedding_model is null
+  and embeddings is not null;
@@ -0,0 +1,65 @@
+"""Embed stored job descriptions that have no vector yet.
+
+Job descriptions saved before migration 003 (or with an older embedding
+model) have no usable ``embeddings``, so /resume/resume/{id}/jobs cannot
+rank them. This encodes them in batches with the current model and stores
+the vectors and signature; the job index picks them up on its next sync.
+
+Run this from the backend directory, after applying the migrations:
+    python scripts/backfill_job_embeddings.py
+    python scripts/backfill_job_embeddings.py --batch-size 64 --dry-run
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+async def backfill(batch_size: int, dry_run: bool) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from app.database.database import close_async_db, get_async_db
+    from app.repositories.match_repository import MatchRepository
+    from app.services.parser import embedding_signature, get_embeddings_batch
+
+    repo = MatchRepository(get_async_db())
+    signature = embedding_signature()
+    done = 0
+    try:
+        while True:
+            # Updated rows drop out of the query, so always read the first page
+            jobs = await repo.get_jobs_missing_embeddings(signature, limit=batch_size)
+            if not jobs:
+                break
+            if dry_run:
+                print(f"{len(jobs)}+ job description(s) need embeddings ({signature})")
+                break
+            vectors = get_embeddings_batch([job["description"] or "" for job in jobs])
+            for job, vector in zip(jobs, vectors, strict=True):
+                await repo.update_job(job["id"], {"embeddings": vector, "embedding_model": signature})
+            done += len(jobs)
+            print(f"Embedded {done} job description(s)")
+    finally:
+        await close_async_db()
+    return done
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--batch-size", type=int, default=128, help="descriptions encoded per model call")
+    ap.add_argument("--dry-run", action="store_true", help="only report whether any rows need embedding")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    done = asyncio.run(backfill(args.batch_size, args.dry_run))
+    if not args.dry_run:
+        print(f"Done: {done} job description(s) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark spaCy NER throughput for the pipeline profiles.
+
+Compares the full packaged pipeline with the trimmed "ner" profile, one
+document at a time and batched through nlp.pipe, and reports documents per
+second. Uses synthetic resume-like texts by default, or the PDF/DOCX files
+in a directory with --docs.
+
+Run this from the backend directory:
+    python scripts/benchmark_spacy.py --n 500
+    python scripts/benchmark_spacy.py --docs ~/resumes --n-process 1 4
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.parser import load_nlp  # noqa: E402
+
+WORDS = (
+    "python developer experience university stanford google led team built "
+    "scalable services kubernetes docker aws data pipelines machine learning "
+    "bachelor computer science london new york microsoft analytics project"
+).split()
+
+
+def synthetic_texts(n: int, words: int = 600, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        body = " ".join(rng.choice(WORDS) for _ in range(words))
+        texts.append(f"Jane Doe worked at Google in London. {body}. Studied at Stanford University.")
+    return texts
+
+
+def document_texts(directory: Path) -> list[str]:
+    from app.services.parser import extract_text
+
+    paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in (".pdf", ".docx"))
+    return [extract_text(str(p)) for p in paths]
+
+
+def docs_per_second(fn, count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default=settings.spacy_model)
+    ap.add_argument("--n", type=int, default=300, help="synthetic document count")
+    ap.add_argument("--docs", type=Path, help="directory of PDF/DOCX files to use instead")
+    ap.add_argument("--batch-size", type=int, default=settings.spacy_batch_size)
+    ap.add_argument("--n-process", type=int, nargs="+", default=[1])
+    args = ap.parse_args()
+
+    texts = document_texts(args.docs) if args.docs else synthetic_texts(args.n)
+    print(f"{len(texts)} documents, model {args.model}\n")
+
+    for profile in ("full", "ner"):
+        nlp = load_nlp(args.model, profile)
+        nlp(texts[0])  # warm up
+        print(f"{profile:<5} pipeline: {', '.join(nlp.pipe_names)}")
+
+        rate = docs_per_second(lambda nlp=nlp: [nlp(t) for t in texts], len(texts))
+        print(f"  one at a time             {rate:8.1f} docs/s")
+        for n_process in args.n_process:
+            rate = docs_per_second(
+                lambda nlp=nlp, n_process=n_process: list(
+                    nlp.pipe(texts, batch_size=args.batch_size, n_process=n_process)
+                ),
+                len(texts),
+            )
+            print(f"  pipe batch={args.batch_size:<4} n_process={n_process:<2} {rate:8.1f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark the IVF vector index against exact search.
+
+Reports build/train time, query latency and recall@k of the approximate
+index versus the exact scan. Uses synthetic clustered vectors by default, or
+the real stored resume embeddings with --from-db.
+
+Run this from the backend directory:
+    python scripts/benchmark_vector_index.py --n 200000 --nprobe 8
+    python scripts/benchmark_vector_index.py --from-db
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.vector_index import (  # noqa: E402
+    IVFVectorIndex,
+    VectorIndex,
+    recall_at_k,
+)
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Gaussian blobs around random centres, roughly like real topic clusters."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return centres[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+async def stored_vectors() -> tuple[list[int], np.ndarray]:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from app.database.database import close_async_db, get_async_db
+    from app.repositories.resume_repository import ResumeRepository
+    from app.services.parser import embedding_signature
+    from app.services.vector_index import to_vector
+
+    repo = ResumeRepository(get_async_db())
+    ids = await repo.list_embedding_ids(embedding_signature())
+    rows = [(row["id"], to_vector(row["embeddings"])) async for row in repo.get_embeddings(ids)]
+    await close_async_db()
+    rows = [(i, v) for i, v in rows if v is not None]
+    return [i for i, _ in rows], np.stack([v for _, v in rows])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=100_000, help="synthetic corpus size")
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--clusters", type=int, default=200, help="synthetic topic clusters")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--nlist", type=int, default=0, help="0 = about 4 * sqrt(n)")
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    ap.add_argument("--from-db", action="store_true", help="use stored resume embeddings")
+    args = ap.parse_args()
+
+    if args.from_db:
+        ids, vectors = asyncio.run(stored_vectors())
+    else:
+        vectors = synthetic_vectors(args.n, args.dim, args.clusters)
+        ids = list(range(len(vectors)))
+    print(f"Corpus: {len(vectors)} vectors, dim {vectors.shape[1]}")
+
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = vectors[picks] + 0.3 * rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32)
+
+    exact = VectorIndex("bench")
+    ivf = IVFVectorIndex("bench", nlist=args.nlist, min_train_size=1)
+    _, load_s = timed(lambda: [(exact.add(i, v), ivf.add(i, v)) for i, v in zip(ids, vectors, strict=True)])
+    _, train_s = timed(ivf.train)
+    print(f"Load: {load_s:.2f}s   IVF train: {train_s:.2f}s ({len(ivf._centroids)} lists)")
+
+    _, exact_s = timed(lambda: [exact.search(q, args.k) for q in queries])
+    print(f"\nexact         {exact_s / len(queries) * 1000:8.2f} ms/query   recall@{args.k} 1.000")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        _, ivf_s = timed(lambda: [ivf.search(q, args.k) for q in queries])
+        recall = recall_at_k(ivf, exact, queries, args.k)
+        print(f"ivf nprobe={nprobe:<3} {ivf_s / len(queries) * 1000:8.2f} ms/query   recall@{args.k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
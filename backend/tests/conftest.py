@@ -7,6 +7,9 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Parse in-process so tests can patch app.services.parser functions
+os.environ.setdefault("PARSER_WORKERS", "0")
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -16,6 +19,27 @@ from main import app
 TEST_API_KEY = os.environ.get("API_KEY", "default_unsafe_dev_key")
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_dir(tmp_path_factory):
+    """Keep the SQLite stores and index snapshots out of backend/cache."""
+    from app.core.config import settings
+    from app.services.jobs import get_job_store
+    from app.services.llm import get_analysis_cache
+    from app.services.parser import get_embedding_cache
+    from app.services.stats_cache import get_stats_cache
+    from app.services.vector_index import get_job_index, get_resume_index
+
+    stores = (get_job_store, get_analysis_cache, get_embedding_cache, get_stats_cache, get_job_index, get_resume_index)
+    original = settings.cache_dir
+    settings.cache_dir = str(tmp_path_factory.mktemp("cache"))
+    for store in stores:
+        store.cache_clear()
+    yield Path(settings.cache_dir)
+    settings.cache_dir = original
+    for store in stores:
+        store.cache_clear()
+
+
 @pytest.fixture
 def client():
     """Unauthenticated test client (for testing auth-free or 403 scenarios)."""
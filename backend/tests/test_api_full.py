@@ -3,7 +3,9 @@
 import os
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
 
 # Add backend directory to python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -34,13 +36,22 @@ def pdf_file():
 from app.database.database import get_db
 
 
+class QueryMock(MagicMock):
+    """Query-builder mock whose ``execute()`` is awaitable, like the async client."""
+
+    def _get_child_mock(self, **kwargs):
+        if kwargs.get("name") == "execute":
+            return AsyncMock(**kwargs)
+        return QueryMock(**kwargs)
+
+
 @pytest.fixture
 def mock_db():
-    """Mock the Supabase client."""
+    """Mock the async Supabase (PostgREST) client."""
     mock_client = MagicMock()
 
     def side_effect(table_name):
-        table_mock = MagicMock()
+        table_mock = QueryMock()
         if table_name == "resumes":
             resume_record = {
                 "id": 123,
@@ -56,9 +67,6 @@ def mock_db():
             table_mock.select.return_value.in_.return_value.execute.return_value.data = [resume_record]
             table_mock.select.return_value.order.return_value.limit.return_value.execute.return_value.data = [resume_record]
             table_mock.select.return_value.eq.return_value.execute.return_value.data = [resume_record]
-            # count() for resume_repo.count()
-            table_mock.select.return_value.execute.return_value.count = 1
-            table_mock.select.return_value.execute.return_value.data = [resume_record]
         elif table_name == "job_descriptions":
             jd_record = {"id": 456, "description": "Python Developer", "skills": ["Python"]}
             table_mock.insert.return_value.execute.return_value.data = [jd_record]
@@ -74,6 +82,8 @@ def mock_db():
             }
             table_mock.insert.return_value.execute.return_value.data = [match_record]
             table_mock.select.return_value.execute.return_value.data = [match_record]
+            history = table_mock.select.return_value.order.return_value.order.return_value.limit.return_value
+            history.execute.return_value.data = [match_record]
             # Properly mock count for get_stats()
             table_mock.select.return_value.execute.return_value.count = 1
         return table_mock
@@ -89,6 +99,23 @@ MOCK_ENTITIES = {"skills": ["Python", "FastAPI", "Docker"], "education": [], "ex
 MOCK_EMBEDDINGS = [0.1] * 384  # all-MiniLM-L6-v2 produces 384-dim embeddings
 
 
+def mock_analyses(texts, batch_size=None):
+    from app.services.parser import DocumentAnalysis
+
+    return [
+        DocumentAnalysis(
+            text=text,
+            segments=[],
+            segment_embeddings=np.zeros((0, 384), dtype=np.float32),
+            embedding=np.array(MOCK_EMBEDDINGS, dtype=np.float32),
+            keyword_hits={},
+            ner_entities=[],
+            entities={key: list(value) for key, value in MOCK_ENTITIES.items()},
+        )
+        for text in texts
+    ]
+
+
 def test_full_flow(auth_client, pdf_file, mock_db):
     """Test the full flow: Upload -> Match -> List (parser is mocked to avoid heavy ML dep)."""
 
@@ -97,9 +124,13 @@ def test_full_flow(auth_client, pdf_file, mock_db):
 
     with (
         patch("app.services.parser.extract_text", return_value=MOCK_PARSER_TEXT),
-        patch("app.services.parser.extract_entities", return_value=MOCK_ENTITIES),
-        patch("app.services.parser.get_embeddings", return_value=MOCK_EMBEDDINGS),
+        patch("app.services.parser.analyze_documents", side_effect=mock_analyses),
+        patch("app.services.parser.get_skill_embeddings_for", return_value=[MOCK_EMBEDDINGS] * 3),
         patch("app.services.storage.upload_file", return_value="https://example.com/file.pdf"),
+        patch(
+            "app.repositories.resume_repository.ResumeRepository.get_by_file_hash",
+            return_value=None,
+        ),
     ):
         # 1. Upload Resume
         with open(pdf_file, "rb") as f:
@@ -115,7 +146,7 @@ def test_full_flow(auth_client, pdf_file, mock_db):
     resume_id = resume_data["id"]
 
     with (
-        patch("app.services.parser.extract_entities", return_value=MOCK_ENTITIES),
+        patch("app.services.parser.analyze_documents", side_effect=mock_analyses),
         patch(
             "app.services.parser.calculate_match",
             return_value=(85.0, []),
@@ -144,6 +175,225 @@ def test_full_flow(auth_client, pdf_file, mock_db):
     # 4. List Matches
     matches_resp = auth_client.get("/resume/matches")
     assert matches_resp.status_code == 200
+    assert matches_resp.json()[0]["resume_filename"] == "test_resume.pdf"
+    assert "X-Next-Cursor" not in matches_resp.headers
 
     # Clean up dependency override
     app.dependency_overrides.clear()
+
+
+def test_duplicate_upload_skips_parsing(auth_client, pdf_file, mock_db):
+    """Re-uploading identical bytes returns the stored parse without re-parsing."""
+    app.dependency_overrides[get_db] = lambda: mock_db
+    existing = {
+        "id": 123,
+        "filename": "test_resume.pdf",
+        "text": "John Doe Python Developer",
+        "skills": ["Python"],
+        "education": [],
+        "experience": [],
+        "file_url": "https://example.com/file.pdf",
+    }
+
+    with (
+        patch("app.services.parser.extract_text") as extract_text,
+        patch(
+            "app.repositories.resume_repository.ResumeRepository.get_by_file_hash",
+            return_value=existing,
+        ),
+        open(pdf_file, "rb") as f,
+    ):
+        resp = auth_client.post(
+            "/resume/upload",
+            files={"file": (os.path.basename(pdf_file), f, "application/pdf")},
+        )
+
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200, f"Upload failed: {resp.text}"
+    assert resp.json()["id"] == 123
+    assert resp.json()["duplicate"] is True
+    extract_text.assert_not_called()
+
+
+def test_batch_upload_reports_per_file_status(auth_client, pdf_file, mock_db):
+    """Batch upload parses each distinct file once and reports every file."""
+    app.dependency_overrides[get_db] = lambda: mock_db
+
+    with open(pdf_file, "rb") as f:
+        pdf_bytes = f.read()
+
+    with (
+        patch("app.services.parser.extract_text", return_value=MOCK_PARSER_TEXT) as extract_text,
+        patch("app.services.parser.analyze_documents", side_effect=mock_analyses),
+        patch("app.services.parser.get_skill_embeddings_batch", return_value=[[MOCK_EMBEDDINGS] * 3]),
+        patch(
+            "app.repositories.resume_repository.ResumeRepository.get_by_file_hashes",
+            return_value={},
+        ),
+    ):
+        resp = auth_client.post(
+            "/resume/upload/batch",
+            files=[
+                ("files", ("a.pdf", pdf_bytes, "application/pdf")),
+                ("files", ("b.pdf", pdf_bytes, "application/pdf")),
+                ("files", ("notes.txt", b"hello world", "text/plain")),
+            ],
+        )
+
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200, f"Batch upload failed: {resp.text}"
+    body = resp.json()
+    assert (body["total"], body["created"], body["duplicates"], body["failed"]) == (3, 1, 1, 1)
+    statuses = {item["filename"]: item["status"] for item in body["items"]}
+    assert statuses == {"a.pdf": "created", "b.pdf": "duplicate", "notes.txt": "error"}
+    assert extract_text.call_count == 1
+
+
+def test_batch_parse_failure_marks_only_the_bad_file():
+    """A failing parse chunk is retried per file, so the others still succeed."""
+    import asyncio
+
+    from app.services.resume_service import ResumeService
+
+    async def fake_run(fn, texts):
+        if "bad" in texts:
+            raise ValueError("unparseable")
+        return [{"text": text} for text in texts]
+
+    docs = [{"text": "good"}, {"text": "bad"}, {"text": "fine"}]
+    with patch("app.services.resume_service.parsing_executor.run", side_effect=fake_run):
+        results = asyncio.run(ResumeService(MagicMock())._parse_texts(docs))
+
+    assert results[0] == {"text": "good"} and results[2] == {"text": "fine"}
+    assert isinstance(results[1], ValueError)
+
+
+def test_match_history_keyset_pages(auth_client, mock_db):
+    """A full page returns a cursor that resumes after its last row."""
+    from app.services.match_service import decode_cursor
+
+    app.dependency_overrides[get_db] = lambda: mock_db
+    rows = [
+        {"id": 9, "jd_id": 456, "resume_id": 123, "match_score": 90.0, "created_at": "2024-05-02T10:00:00+00:00"},
+        {"id": 8, "jd_id": 456, "resume_id": 123, "match_score": 80.0, "created_at": "2024-05-01T10:00:00+00:00"},
+    ]
+    with patch(
+        "app.repositories.match_repository.MatchRepository._select_in", return_value=[]
+    ):
+        matches = mock_db.table("matches")
+        mock_db.table = MagicMock(return_value=matches)
+        page = matches.select.return_value.eq.return_value.gte.return_value.order.return_value
+        page.order.return_value.limit.return_value.execute.return_value.data = rows
+
+        first = auth_client.get("/resume/matches?limit=1&resume_id=123&min_score=50")
+        bad = auth_client.get("/resume/matches?cursor=not-a-cursor")
+
+    app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert [m["id"] for m in first.json()] == [9]
+    assert decode_cursor(first.headers["X-Next-Cursor"]) == ("2024-05-02T10:00:00+00:00", 9)
+    matches.select.assert_any_call("id, jd_id, resume_id, match_score, missing_skills, created_at")
+    assert bad.status_code == 400
+
+
+async def _no_embeddings(self, ids):
+    for row in ():
+        yield row
+
+
+def test_rank_jobs_for_resume(auth_client, mock_db):
+    """Stored JDs are ranked for a resume, with duplicates collapsed."""
+    from app.services.vector_index import VectorIndex
+
+    app.dependency_overrides[get_db] = lambda: mock_db
+    resume = {"id": 123, "text": MOCK_PARSER_TEXT, "skills": ["Python", "Docker"]}
+    jobs = [
+        {"id": 1, "description": "Python backend role", "skills": ["Python", "Go"]},
+        {"id": 2, "description": "python  backend role", "skills": ["Python", "Go"]},
+        {"id": 3, "description": "Frontend role", "skills": ["React"]},
+    ]
+    index = VectorIndex("test")
+    index.add(1, [1.0, 0.0])
+    index.add(2, [0.9, 0.1])
+    index.add(3, [0.0, 1.0])
+
+    with (
+        patch("app.services.match_service.get_job_index", return_value=index),
+        patch("app.services.parser.get_embeddings", return_value=[1.0, 0.0]),
+        patch(
+            "app.repositories.resume_repository.ResumeRepository.get_by_id",
+            return_value=resume,
+        ),
+        patch(
+            "app.repositories.match_repository.MatchRepository.list_job_embedding_ids",
+            return_value=[1, 2, 3],
+        ),
+        patch(
+            "app.repositories.match_repository.MatchRepository.get_job_embeddings",
+            _no_embeddings,
+        ),
+        patch("app.repositories.match_repository.MatchRepository.get_jobs", return_value=jobs),
+    ):
+        resp = auth_client.get("/resume/resume/123/jobs?top_n=5")
+
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200, f"Ranking failed: {resp.text}"
+    results = resp.json()["results"]
+    assert [r["jd_id"] for r in results] == [1, 3]
+    assert results[0]["matched_skills"] == ["Python"]
+    assert results[0]["missing_skills"] == ["Go"]
+    assert results[0]["skill_coverage"] == 50.0
+
+
+def test_search_resumes_ranks_stored_resumes(auth_client, mock_db):
+    """Top-k search returns index hits in order, skipping ids no longer stored."""
+    from app.services.vector_index import VectorIndex
+
+    app.dependency_overrides[get_db] = lambda: mock_db
+    index = VectorIndex("test")
+    index.add(1, [1.0, 0.0])
+    index.add(2, [0.8, 0.2])
+    index.add(3, [0.0, 1.0])
+    index.add(4, [0.9, 0.1])  # in the index, but deleted from the database
+    rows = [
+        {"id": 2, "filename": "b.pdf", "text": "Go", "skills": ["Go"]},
+        {"id": 1, "filename": "a.pdf", "text": "Python", "skills": ["Python"]},
+        {"id": 3, "filename": "c.pdf", "text": "React", "skills": ["React"]},
+    ]
+
+    with (
+        patch("app.services.match_service.get_resume_index", return_value=index),
+        patch(
+            "app.services.match_service.parse_job_description",
+            return_value=({"skills": ["Python"]}, [1.0, 0.0]),
+        ),
+        patch(
+            "app.services.match_service.missing_skills_for_resumes",
+            side_effect=lambda resumes, *args: [[] if "Python" in r["skills"] else ["Python"] for r in resumes],
+        ),
+        patch(
+            "app.repositories.resume_repository.ResumeRepository.list_embedding_ids",
+            return_value=[1, 2, 3, 4],
+        ),
+        patch("app.repositories.resume_repository.ResumeRepository.get_embeddings", _no_embeddings),
+        patch("app.repositories.resume_repository.ResumeRepository.get_many", return_value=rows) as get_many,
+    ):
+        resp = auth_client.post("/resume/search", json={"job_description": "Python developer", "top_k": 3})
+        too_many = auth_client.post("/resume/search", json={"job_description": "Python developer", "top_k": 101})
+
+    app.dependency_overrides.clear()
+
+    assert resp.status_code == 200, f"Search failed: {resp.text}"
+    body = resp.json()
+    assert body["jd_skills"] == ["Python"]
+    assert [r["resume_id"] for r in body["results"]] == [1, 2]
+    assert [r["filename"] for r in body["results"]] == ["a.pdf", "b.pdf"]
+    assert body["results"][0]["score"] > body["results"][1]["score"]
+    assert body["results"][1]["missing_skills"] == ["Python"]
+    # Only the top_k index hits are fetched, so resume 3 never comes back
+    assert sorted(get_many.call_args.args[0]) == [1, 2, 4]
+    assert too_many.status_code == 422
@@ -0,0 +1,94 @@
+"""Test the circuit breaker state machine."""
+
+import pytest
+
+from app.services import circuit_breaker as cb
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cb.time, "monotonic", clock)
+    return clock
+
+
+def tripped(clock, **options) -> CircuitBreaker:
+    breaker = CircuitBreaker("Ollama", min_calls=4, open_seconds=30, **options)
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(False, 0.1, "ConnectError")
+    return breaker
+
+
+def test_opens_after_failure_rate_and_fails_fast(clock):
+    breaker = CircuitBreaker("Ollama", failure_rate=0.5, min_calls=4)
+    for ok in (True, False, True):
+        breaker.before_call()
+        breaker.record(ok, 0.1, None if ok else "HTTP 500")
+    assert breaker.state == "closed"  # under min_calls
+
+    breaker.before_call()
+    breaker.record(False, 0.1, "HTTP 500")
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.status_code == 503
+    assert exc.value.details["retry_in_seconds"] == 30
+
+
+def test_half_open_admits_one_trial_and_closes_on_success(clock):
+    breaker = tripped(clock)
+    clock.now += 31
+    assert breaker.state == "half_open"
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+
+    breaker.record(True, 0.2)
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["recent_calls"] == 0
+
+
+def test_failed_trial_reopens_with_longer_cooldown(clock):
+    breaker = tripped(clock)
+    clock.now += 31
+    breaker.before_call()
+    breaker.record(False, 0.2, "ConnectError")
+
+    assert breaker.state == "open"
+    assert breaker.retry_in() == pytest.approx(60)
+    clock.now += 59
+    assert breaker.state == "open"
+    clock.now += 2
+    assert breaker.state == "half_open"
+
+
+def test_cancelled_trial_frees_the_slot(clock):
+    breaker = tripped(clock)
+    clock.now += 31
+    breaker.before_call()
+    breaker.cancel_call()
+    breaker.before_call()
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker("Ollama", min_calls=2, slow_call_seconds=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(True, 15.0)
+
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == "open"
+    assert snapshot["failure_rate"] == 1.0
+    assert "slow" in snapshot["last_error"]
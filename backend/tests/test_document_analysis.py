@@ -0,0 +1,65 @@
+"""Test that a document is encoded once per analysis."""
+
+import hashlib
+
+import numpy as np
+import spacy
+import torch
+
+from app.services import parser
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        vectors = [
+            np.random.default_rng(int(hashlib.md5(t.encode()).hexdigest()[:8], 16)).standard_normal(8)
+            for t in texts
+        ]
+        return torch.tensor(np.array(vectors, dtype=np.float32).reshape(len(texts), 8))
+
+
+def _patch_models(monkeypatch):
+    encoder = CountingEncoder()
+    nlp = spacy.blank("en")
+    monkeypatch.setattr(parser, "encode", encoder)
+    monkeypatch.setattr(parser, "pipe_docs", lambda texts, batch_size=None: nlp.pipe(texts))
+    monkeypatch.setattr(
+        parser, "get_skill_embeddings", lambda: encoder(parser.SKILL_KEYWORDS).numpy()
+    )
+    return encoder
+
+
+def test_analysis_encodes_segments_and_text_in_one_call(monkeypatch):
+    encoder = _patch_models(monkeypatch)
+    texts = ["Senior Python developer. Built Docker based services", "Short"]
+
+    analyses = parser.analyze_documents(texts)
+
+    document_calls = [call for call in encoder.calls if call != parser.SKILL_KEYWORDS]
+    assert len(document_calls) == 1
+    assert document_calls[0] == ["Senior Python developer", "Built Docker based services", *texts]
+    assert analyses[0].segment_embeddings.shape == (2, 8)
+    assert analyses[1].segments == []
+    assert "Python" in analyses[0].entities["skills"]
+
+
+def test_match_reuses_supplied_vectors(monkeypatch):
+    encoder = _patch_models(monkeypatch)
+
+    score, missing = parser.calculate_match(
+        resume_text="python developer",
+        resume_skills=["Python"],
+        jd_text="python role",
+        jd_skills=["Python"],
+        resume_embedding=[1.0] * 8,
+        resume_skill_embeddings=[[1.0] * 8],
+        jd_embedding=np.ones(8, dtype=np.float32),
+    )
+
+    assert encoder.calls == []
+    assert score == 100.0
+    assert missing == []
@@ -0,0 +1,59 @@
+"""Test the content-addressed embedding cache."""
+
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.seen: list[str] = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+def test_batch_encodes_only_distinct_misses():
+    encoder = FakeEncoder()
+    cache = EmbeddingCache("model-a", max_bytes=1024 * 1024)
+
+    cache.encode(["python", "docker"], encoder)
+    result = cache.encode(["docker", "rust", "rust", "python"], encoder)
+
+    assert encoder.seen == ["python", "docker", "rust"]
+    assert result.shape == (4, 2)
+    np.testing.assert_array_equal(result[1], result[2])
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+
+
+def test_lru_respects_byte_budget():
+    encoder = FakeEncoder()
+    # Room for roughly two entries
+    cache = EmbeddingCache("model-a", max_bytes=500)
+
+    cache.encode(["a"], encoder)
+    cache.encode(["b"], encoder)
+    cache.encode(["a"], encoder)  # refresh "a"
+    cache.encode(["c"], encoder)  # evicts "b"
+    cache.encode(["a", "b"], encoder)
+
+    assert encoder.seen == ["a", "b", "c", "b"]
+    assert cache.stats()["bytes"] <= 500
+
+
+def test_disk_tier_survives_restart_and_is_keyed_by_model(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    encoder = FakeEncoder()
+    EmbeddingCache("model-a", max_bytes=1024, disk_path=path).encode(["python"], encoder)
+
+    restarted = EmbeddingCache("model-a", max_bytes=1024, disk_path=path)
+    restarted.encode(["python"], encoder)
+    assert encoder.seen == ["python"]
+    assert restarted.stats()["disk_hits"] == 1
+
+    other_model = EmbeddingCache("model-b", max_bytes=1024, disk_path=path)
+    other_model.encode(["python"], encoder)
+    assert encoder.seen == ["python", "python"]
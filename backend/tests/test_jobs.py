@@ -0,0 +1,95 @@
+"""Test the background job store, runner and endpoints."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from app.services.job_store import JobStore
+from app.services.jobs import JobRunner, run_upload_job
+
+
+def test_claim_finish_and_orphan_requeue(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    first = store.create("upload", {"filename": "a.pdf"}, b"%PDF")
+    second = store.create("analyze", {"resume_id": 1})
+
+    job, data = store.claim_next()
+    assert (job["id"], job["status"], data) == (first["id"], "running", b"%PDF")
+
+    store.finish(job["id"], result={"id": 7})
+    done = store.get(job["id"])
+    assert (done["status"], done["progress"], done["result"]) == ("succeeded", 1.0, {"id": 7})
+
+    # A running job keeps its worker while the lease is renewed...
+    job, _ = store.claim_next()
+    assert job["id"] == second["id"]
+    store.renew_lease(job["id"])
+    assert store.requeue_orphans() == 0
+
+    # ...and goes back in the queue once its worker stops renewing it
+    store._db.execute("UPDATE jobs SET lease_until = ? WHERE id = ?", (time.time() - 1, job["id"]))
+    assert store.requeue_orphans() == 1
+    assert store.get(second["id"])["status"] == "queued"
+
+
+def test_runner_reports_stages_and_result(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    stages = []
+
+    async def handler(job, data, progress):
+        for stage in ("extract", "analyze", "skills", "store"):
+            await progress(stage)
+            stages.append(store.get(job["id"])["stage"])
+        return {"id": 1, "size": len(data)}
+
+    async def failing(job, data, progress):
+        await progress("llm")
+        raise ValueError("boom")
+
+    runner = JobRunner(workers=1, handlers={"upload": handler, "analyze": failing})
+    with patch("app.services.jobs.get_job_store", return_value=store):
+        ok = asyncio.run(runner.submit("upload", {}, b"1234"))
+        bad = asyncio.run(runner.submit("analyze", {}))
+        asyncio.run(runner.run_job(*store.claim_next()))
+        asyncio.run(runner.run_job(*store.claim_next()))
+
+    assert stages == ["extract", "analyze", "skills", "store"]
+    assert store.get(ok["id"])["result"] == {"id": 1, "size": 4}
+    failed = store.get(bad["id"])
+    assert failed["status"] == "failed" and failed["stage"] == "failed" and failed["error"]
+    assert failed["progress"] == 0.1
+
+
+def test_upload_job_result_matches_upload_response():
+    row = {
+        "id": 3, "filename": "a.pdf", "text": "Python", "skills": ["python"],
+        "embeddings": [0.1] * 4, "file_hash": "abc", "file_url": "https://x",
+    }
+    job = {"params": {"filename": "a.pdf", "content_type": "application/pdf"}}
+
+    async def noop(stage):
+        pass
+
+    with (
+        patch("app.services.resume_service.ResumeService.process_document", return_value=row),
+        patch("app.database.database.get_async_db"),
+    ):
+        result = asyncio.run(run_upload_job(job, b"%PDF", noop))
+
+    assert result["id"] == 3 and result["skills"] == ["python"]
+    assert not {"embeddings", "file_hash", "file_url"} & result.keys()
+
+
+def test_submit_returns_job_to_poll(auth_client, tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    with patch("app.services.jobs.get_job_store", return_value=store):
+        resp = auth_client.post("/resume/jobs/analyze", json={"resume_id": 5})
+        assert resp.status_code == 202, resp.text
+        job = resp.json()
+        assert (job["kind"], job["status"]) == ("analyze", "queued")
+
+        polled = auth_client.get(f"/resume/jobs/{job['id']}")
+        assert polled.status_code == 200
+        assert polled.json()["id"] == job["id"]
+
+        assert auth_client.get("/resume/jobs/missing").status_code == 404
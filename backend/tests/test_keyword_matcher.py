@@ -0,0 +1,40 @@
+"""Test the Aho-Corasick keyword matcher."""
+
+from app.services.keyword_matcher import KeywordMatcher
+
+
+def test_finds_overlapping_keywords_in_one_pass():
+    matcher = KeywordMatcher(
+        [("Spring", "skill"), ("Spring Boot", "skill"), ("Boot", "skill"), ("SQL", "skill")]
+    )
+    hits = matcher.find("Built services with spring boot and PostgreSQL, SQL tuning")
+    assert hits["skill"] == {"Spring", "Spring Boot", "Boot", "SQL"}
+
+
+def test_requires_word_boundaries():
+    matcher = KeywordMatcher([("Java", "skill"), ("Go", "skill"), ("qa", "role")])
+    hits = matcher.find("JavaScript developer, good at Django. Aqua-culture hobbyist.")
+    assert hits["skill"] == set()
+    assert hits["role"] == set()
+
+
+def test_short_acronyms_are_case_sensitive():
+    matcher = KeywordMatcher([("R", "skill"), ("ME", "education"), ("MBA", "education")])
+    hits = matcher.find("Contact me about r&d work. Holds an mba and an ME. Uses R daily.")
+    assert hits["skill"] == {"R"}
+    assert hits["education"] == {"ME", "MBA"}
+
+
+def test_symbol_keywords_and_labels():
+    matcher = KeywordMatcher(
+        [("C++", "skill"), ("C#", "skill"), ("Node.js", "skill"), ("full-stack", "role")]
+    )
+    hits = matcher.find("Full-Stack engineer: C++, C# and node.js.")
+    assert hits["skill"] == {"C++", "C#", "Node.js"}
+    assert hits["role"] == {"full-stack"}
+
+
+def test_find_all_reports_offsets():
+    matcher = KeywordMatcher([("Docker", "skill")])
+    text = "Docker, docker"
+    assert [(s, e) for s, e, _, _ in matcher.find_all(text)] == [(0, 6), (8, 14)]
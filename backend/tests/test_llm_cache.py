@@ -0,0 +1,61 @@
+"""Test the on-disk LLM analysis cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.llm_cache import AnalysisCache, analysis_cache_key
+
+
+def test_key_depends_on_every_input():
+    base = analysis_cache_key("mistral", 1, "resume", "jd")
+    assert base == analysis_cache_key("mistral", 1, "resume", "jd")
+    assert base != analysis_cache_key("llama3", 1, "resume", "jd")
+    assert base != analysis_cache_key("mistral", 2, "resume", "jd")
+    assert base != analysis_cache_key("mistral", 1, "resume", None)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = AnalysisCache(tmp_path / "llm.sqlite3", "mistral", ttl_seconds=60, max_bytes=10_000)
+    cache.put("k", {"score": 80})
+    assert cache.get("k") == {"score": 80}
+
+    with patch("app.services.llm_cache.time.time", return_value=10**12):
+        assert cache.get("k") is None
+
+
+def test_oldest_entries_evicted_over_budget(tmp_path):
+    cache = AnalysisCache(tmp_path / "llm.sqlite3", "mistral", ttl_seconds=3600, max_bytes=100)
+    for i in range(5):
+        cache.put(f"k{i}", {"summary": "x" * 30, "i": i})
+
+    assert cache.get("k0") is None
+    assert cache.get("k4") is not None
+
+
+def test_model_change_purges_entries(tmp_path):
+    path = tmp_path / "llm.sqlite3"
+    AnalysisCache(path, "mistral", ttl_seconds=3600, max_bytes=10_000).put("k", {"score": 1})
+
+    assert AnalysisCache(path, "llama3", ttl_seconds=3600, max_bytes=10_000).get("k") is None
+
+
+def test_analyze_resume_serves_repeat_from_cache(tmp_path):
+    from app.services import llm
+
+    cache = AnalysisCache(tmp_path / "llm.sqlite3", llm.DEFAULT_MODEL, 3600, 10_000)
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"response": '{"summary": "Good", "score": 80}'}
+    generate = AsyncMock(return_value=response)
+
+    with (
+        patch.object(llm, "get_analysis_cache", return_value=cache),
+        patch.object(llm.ollama_client, "generate", generate),
+    ):
+        first = asyncio.run(llm.analyze_resume("resume text", "a job description"))
+        second = asyncio.run(llm.analyze_resume("resume text", "a job description"))
+        refreshed = asyncio.run(llm.analyze_resume("resume text", "a job description", refresh=True))
+
+    assert first["score"] == 80 and "cached" not in first
+    assert second["cached"] is True
+    assert "cached" not in refreshed
+    assert generate.await_count == 2
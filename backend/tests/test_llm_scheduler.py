@@ -0,0 +1,71 @@
+"""Test the LLM request scheduler."""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import AppException
+from app.services.llm import PRIORITY_BATCH, PRIORITY_INTERACTIVE, LLMScheduler
+
+
+def test_concurrency_cap_and_priority_order():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, max_queue=10, expected_seconds=5.0)
+        release = asyncio.Event()
+        order = []
+
+        def job(name):
+            async def run():
+                order.append(name)
+                await release.wait()
+                return name
+            return run
+
+        first = scheduler.submit(None, job("first"), PRIORITY_BATCH)
+        batch = scheduler.submit(None, job("batch"), PRIORITY_BATCH)
+        interactive = scheduler.submit(None, job("interactive"), PRIORITY_INTERACTIVE)
+        await asyncio.sleep(0)
+
+        assert scheduler.stats()["running"] == 1
+        assert (interactive.position, batch.position) == (0, 1)
+        assert batch.wait_seconds == 10.0
+
+        release.set()
+        await asyncio.gather(first.result(), batch.result(), interactive.result())
+        return order
+
+    assert asyncio.run(scenario()) == ["first", "interactive", "batch"]
+
+
+def test_identical_requests_share_one_generation():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=2, max_queue=10, expected_seconds=5.0)
+        calls = 0
+
+        async def generate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"score": 80}
+
+        a = scheduler.submit("same-prompt", generate)
+        b = scheduler.submit("same-prompt", generate)
+        results = await asyncio.gather(a.result(), b.result())
+        return a is b, calls, results
+
+    shared, calls, results = asyncio.run(scenario())
+    assert shared and calls == 1
+    assert results == [{"score": 80}, {"score": 80}]
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        scheduler = LLMScheduler(max_concurrency=1, max_queue=1, expected_seconds=5.0)
+        never = asyncio.Event()
+        scheduler.submit(None, never.wait)
+        scheduler.submit(None, never.wait)
+        with pytest.raises(AppException) as exc:
+            scheduler.submit(None, never.wait)
+        assert exc.value.status_code == 503
+
+    asyncio.run(scenario())
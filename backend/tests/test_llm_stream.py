@@ -0,0 +1,70 @@
+"""Test incremental JSON parsing and the streaming analyze endpoint."""
+
+import json
+from unittest.mock import patch
+
+from app.services.json_stream import JsonFieldParser
+from app.services.llm_cache import AnalysisCache
+
+ANSWER = (
+    '{"summary": "Strong \\"backend\\" dev, 5 years", "strengths": ["Python", "APIs, REST"], '
+    '"weaknesses": [], "suggestions": ["Add metrics"], "keywords_to_add": ["Kafka"], '
+    '"score": 78, "match_percentage": null}'
+)
+
+
+def test_fields_emitted_as_soon_as_complete():
+    parser = JsonFieldParser()
+    seen = []
+    for i, ch in enumerate(ANSWER):
+        for name, value in parser.feed(ch):
+            seen.append((name, value, i))
+
+    assert [name for name, _, _ in seen] == [
+        "summary", "strengths", "weaknesses", "suggestions", "keywords_to_add", "score", "match_percentage",
+    ]
+    summary = seen[0]
+    assert summary[1] == 'Strong "backend" dev, 5 years'
+    # The summary arrives right at its closing quote, not at the end of the object
+    assert summary[2] == ANSWER.index('years"') + len("years")
+    assert dict((n, v) for n, v, _ in seen)["score"] == 78
+
+
+def _sse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_sends_fields_then_validated_result(auth_client, tmp_path):
+    from app.services import llm
+
+    async def fake_stream(payload):
+        for i in range(0, len(ANSWER), 7):
+            yield {"response": ANSWER[i : i + 7], "done": False}
+        yield {"response": "", "done": True}
+
+    cache = AnalysisCache(tmp_path / "llm.sqlite3", llm.DEFAULT_MODEL, 3600, 10_000)
+    resume = {"id": 1, "text": "Python developer"}
+    with (
+        patch.object(llm, "get_analysis_cache", return_value=cache),
+        patch.object(llm.ollama_client, "stream_generate", fake_stream),
+        patch("app.repositories.resume_repository.ResumeRepository.get_by_id", return_value=resume),
+    ):
+        resp = auth_client.post("/resume/analyze/stream", json={"resume_id": 1})
+        repeat = auth_client.post("/resume/analyze/stream", json={"resume_id": 1})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(resp.text)
+    kinds = [kind for kind, _ in events]
+    assert kinds.index("field") < kinds.index("result") == len(kinds) - 1
+    assert "".join(d["text"] for k, d in events if k == "token") == ANSWER
+    result = events[-1][1]
+    assert result["score"] == 78 and result["cached"] is False
+
+    repeat_events = _sse_events(repeat.text)
+    assert "token" not in [kind for kind, _ in repeat_events]
+    assert repeat_events[-1][1]["cached"] is True
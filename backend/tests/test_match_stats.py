@@ -0,0 +1,37 @@
+"""Test the database-side stats view and its offline stand-in."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.database.local_stats import local_match_stats
+from app.repositories.match_repository import MatchRepository
+
+
+def test_view_aggregates_scores():
+    stats = local_match_stats([85.0, 60.0, 70.0, None], total_resumes=3)
+
+    assert stats == {
+        "total_resumes": 3,
+        "total_matches": 4,
+        "avg_score": 71.7,
+        "success_rate": 66.7,  # null scores don't count towards the rate
+    }
+
+
+def test_view_handles_no_matches():
+    stats = local_match_stats([], total_resumes=0)
+
+    assert stats == {"total_resumes": 0, "total_matches": 0, "avg_score": 0, "success_rate": 0}
+
+
+def test_repository_reads_stats_in_one_query():
+    db = MagicMock()
+    execute = db.table.return_value.select.return_value.execute = AsyncMock()
+    execute.return_value.data = [
+        {"total_resumes": 5, "total_matches": 12, "avg_score": 64.2, "success_rate": 41.7}
+    ]
+
+    stats = asyncio.run(MatchRepository(db).get_stats())
+
+    db.table.assert_called_once_with("match_stats")
+    assert stats == {"total_resumes": 5, "total_matches": 12, "avg_score": 64.2, "success_rate": 41.7}
@@ -0,0 +1,69 @@
+"""Test the shared Ollama HTTP client."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.ollama_client import OllamaClient
+
+
+def test_client_is_reused_until_closed():
+    ollama = OllamaClient("http://ollama.test")
+
+    first = ollama.client
+    assert ollama.client is first
+    assert first.timeout.connect == settings.ollama_connect_timeout
+    assert first.timeout.read == settings.ollama_read_timeout
+    assert first.timeout.pool == settings.ollama_pool_timeout
+
+    asyncio.run(ollama.aclose())
+    assert first.is_closed
+    assert ollama.client is not first
+
+
+def test_server_errors_trip_breaker_and_status_reports_offline():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    ollama = OllamaClient("http://ollama.test")
+    ollama._client = httpx.AsyncClient(
+        base_url="http://ollama.test", transport=httpx.MockTransport(handler)
+    )
+    assert ollama.status()["status"] == "unknown"
+
+    async def exercise():
+        for _ in range(settings.ollama_breaker_min_calls):
+            await ollama.generate({"prompt": "x"})
+        with pytest.raises(CircuitOpenError):
+            await ollama.generate({"prompt": "x"})
+        await ollama.aclose()
+
+    asyncio.run(exercise())
+    assert len(calls) == settings.ollama_breaker_min_calls
+    status = ollama.status()
+    assert status["status"] == "offline"
+    assert status["breaker"]["last_error"] == "HTTP 503"
+
+
+def test_probes_while_closed_stay_out_of_the_breaker_window():
+    ollama = OllamaClient("http://ollama.test")
+    ollama._client = httpx.AsyncClient(
+        base_url="http://ollama.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"models": [{"name": "m"}]})),
+    )
+
+    async def probe():
+        for _ in range(5):
+            await ollama.tags(probe=True)
+        await ollama.aclose()
+
+    asyncio.run(probe())
+    status = ollama.status()
+    assert status["status"] == "online" and status["available_models"] == ["m"]
+    assert status["breaker"]["recent_calls"] == 0
@@ -0,0 +1,85 @@
+"""Test the token-budgeted prompt builder."""
+
+import time
+
+from app.services.prompt_builder import (
+    clean_lines,
+    estimate_tokens,
+    pack_resume,
+    pack_text,
+)
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 123 4567 | https://github.com/jane
+Page 1 of 2
+
+SUMMARY
+Backend engineer focused on data platforms.
+
+EXPERIENCE
+Senior Engineer, Acme Corp (2021 - present)
+Built streaming pipelines in Python and Kafka.
+Engineer, Initech (2017 - 2021)
+Maintained billing services in Java.
+
+Page 2 of 2
+Jane Doe
+
+INTERESTS
+Hiking, chess, baking bread, and a very long list of other hobbies that nobody needs.
+"""
+
+
+def test_clean_lines_drops_boilerplate_and_repeats():
+    lines = clean_lines(RESUME)
+
+    assert lines.count("Jane Doe") == 1
+    assert not any(line.startswith("Page") for line in lines)
+    assert not any("jane@example.com" in line for line in lines)
+
+
+def test_clean_lines_drops_references_boilerplate():
+    text = "References available on request.\nReferences are available upon request\nReferences\nDr. Smith"
+
+    assert clean_lines(text) == ["References", "Dr. Smith"]
+
+
+def test_clean_lines_keeps_date_ranges():
+    lines = clean_lines("Engineer, Initech\n2017 - 2021\n(2015-2017)")
+
+    assert lines == ["Engineer, Initech", "2017 - 2021", "(2015-2017)"]
+
+
+def test_contact_check_is_linear_on_long_digit_runs():
+    start = time.perf_counter()
+    lines = clean_lines("1 " * 200 + "x\n" + "9" * 240 + "a")
+
+    assert time.perf_counter() - start < 0.5
+    assert len(lines) == 2
+
+
+def test_pack_resume_puts_entities_and_experience_first():
+    entities = {"skills": ["python", "kafka"], "experience": ["Acme Corp"]}
+    packed = pack_resume(RESUME, entities, budget=1000)
+
+    assert packed.text.index("Detected skills: kafka, python") < packed.text.index("[Experience]")
+    assert packed.text.index("[Experience]") < packed.text.index("[Summary]")
+    assert packed.saved_tokens > 0
+
+
+def test_pack_resume_respects_budget_and_keeps_latest_role():
+    packed = pack_resume(RESUME, None, budget=25)
+
+    assert packed.tokens <= 25
+    assert "Acme Corp" in packed.text
+    assert "Initech" not in packed.text
+    assert "INTERESTS" not in packed.text
+
+
+def test_pack_text_cuts_on_line_boundaries():
+    text = "\n".join(f"Requirement number {i} for the role" for i in range(100))
+    packed = pack_text(text, budget=50)
+
+    assert packed.tokens <= 50
+    assert packed.original_tokens == estimate_tokens(text)
+    assert packed.text.splitlines()[0] == "Requirement number 0 for the role"
@@ -0,0 +1,38 @@
+"""Test the persisted skill-vocabulary embedding store."""
+
+import numpy as np
+
+from app.services.skill_store import SkillEmbeddingStore
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, skills):
+        self.calls += 1
+        return np.arange(len(skills) * 4, dtype=np.float32).reshape(len(skills), 4)
+
+
+def test_store_is_built_once_and_memory_mapped(tmp_path):
+    encode = FakeEncoder()
+    vocabulary = ["Python", "Docker", "SQL"]
+
+    first = SkillEmbeddingStore(str(tmp_path), "model-a", vocabulary).load(encode)
+    second = SkillEmbeddingStore(str(tmp_path), "model-a", vocabulary).load(encode)
+
+    assert encode.calls == 1
+    assert isinstance(second, np.memmap)
+    assert second.shape == (3, 4)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_store_rebuilds_when_vocabulary_or_model_changes(tmp_path):
+    encode = FakeEncoder()
+
+    SkillEmbeddingStore(str(tmp_path), "model-a", ["Python", "SQL"]).load(encode)
+    SkillEmbeddingStore(str(tmp_path), "model-a", ["Python", "SQL", "Go"]).load(encode)
+    SkillEmbeddingStore(str(tmp_path), "org/model-b", ["Python", "SQL"]).load(encode)
+
+    assert encode.calls == 3
+    assert len(list((tmp_path / "skill_embeddings").glob("*.npy"))) == 3
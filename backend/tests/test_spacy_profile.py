@@ -0,0 +1,23 @@
+"""Test the trimmed spaCy pipeline profile."""
+
+import spacy
+
+from app.services.parser import load_nlp
+
+
+def _saved_pipeline(path):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("tagger").add_label("NN")
+    nlp.add_pipe("ner").add_label("ORG")
+    nlp.initialize()
+    nlp.to_disk(path)
+    return str(path)
+
+
+def test_ner_profile_keeps_only_entity_recognition(tmp_path):
+    path = _saved_pipeline(tmp_path / "pipeline")
+
+    assert load_nlp(path, "full").pipe_names == ["tok2vec", "tagger", "ner"]
+    # tok2vec has no listeners once the tagger is gone, so it is dropped too
+    assert load_nlp(path, "ner").pipe_names == ["ner"]
@@ -0,0 +1,69 @@
+"""Test the cross-worker stats cache."""
+
+import asyncio
+
+from app.services.stats_cache import SharedCache
+
+
+def counter():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"total_matches": len(calls)}
+
+    return compute, calls
+
+
+def test_value_is_cached_until_invalidated(tmp_path):
+    cache = SharedCache(tmp_path / "stats.sqlite3", ttl_seconds=60)
+    compute, calls = counter()
+
+    async def scenario():
+        first = await cache.get_or_compute("stats", compute)
+        second = await cache.get_or_compute("stats", compute)
+        cache.invalidate("stats")
+        third = await cache.get_or_compute("stats", compute)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first == second == {"total_matches": 1}
+    assert third == {"total_matches": 2}
+    assert len(calls) == 2
+
+
+def test_workers_share_entries_and_recompute_once(tmp_path):
+    # Two instances on one file behave like two worker processes
+    workers = [SharedCache(tmp_path / "stats.sqlite3", ttl_seconds=60) for _ in range(2)]
+    compute, calls = counter()
+
+    async def scenario():
+        return await asyncio.gather(
+            *(workers[i % 2].get_or_compute("stats", compute) for i in range(6))
+        )
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == {"total_matches": 1} for result in results)
+
+
+def test_store_from_before_invalidation_is_refused(tmp_path):
+    cache = SharedCache(tmp_path / "stats.sqlite3", ttl_seconds=60)
+    _, _, generation = cache.read("stats")
+
+    cache.invalidate("stats")  # a write lands while the old value is computed
+
+    assert not cache.store("stats", {"total_matches": 1}, generation)
+    assert cache.read("stats")[0] is None
+
+
+def test_expired_value_is_served_while_another_worker_recomputes(tmp_path):
+    cache = SharedCache(tmp_path / "stats.sqlite3", ttl_seconds=0)
+    cache.store("stats", {"total_matches": 1}, 0)
+    assert cache.acquire_lease("stats") is not None  # held by "another worker"
+
+    async def never():
+        raise AssertionError("should not recompute")
+
+    assert asyncio.run(cache.get_or_compute("stats", never)) == {"total_matches": 1}
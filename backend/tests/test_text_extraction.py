@@ -0,0 +1,58 @@
+"""Test PDF/DOCX text extraction from in-memory bytes."""
+
+import io
+
+import docx
+import fitz
+
+from app.services.parser import extract_text
+
+
+def _pdf_bytes(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((50, 50), f"Page {i} text")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_pdf_bytes_extracted_in_page_order():
+    text = extract_text(_pdf_bytes(3), "pdf")
+    assert text.index("Page 0") < text.index("Page 1") < text.index("Page 2")
+
+
+def test_pdf_page_cap_stops_early():
+    text = extract_text(_pdf_bytes(5), "pdf", max_pages=2)
+    assert "Page 1" in text
+    assert "Page 2" not in text
+
+
+def test_docx_bytes():
+    document = docx.Document()
+    document.add_paragraph("Python developer")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    assert extract_text(buffer.getvalue(), ".docx") == "Python developer"
+
+
+def test_page_ranges_cover_large_pdfs_in_order():
+    from app.core.config import settings
+    from app.services.executor import ParsingExecutor, extract_pdf_range
+
+    data = _pdf_bytes(settings.pdf_parallel_min_pages + 5)
+    ranges = ParsingExecutor(max_workers=3).page_ranges(data, "pdf")
+
+    assert len(ranges) == 3
+    assert ranges[0][0] == 0 and ranges[-1][1] == settings.pdf_parallel_min_pages + 5
+    assert all(a[1] == b[0] for a, b in zip(ranges[:-1], ranges[1:], strict=True))
+    merged = "".join(extract_pdf_range(data, start, stop) for start, stop in ranges)
+    assert merged == extract_text(data, "pdf")
+
+
+def test_small_pdfs_keep_single_task_path():
+    from app.services.executor import ParsingExecutor
+
+    assert ParsingExecutor(max_workers=3).page_ranges(_pdf_bytes(2), "pdf") == []
+    assert ParsingExecutor(max_workers=0).page_ranges(_pdf_bytes(40), "pdf") == []
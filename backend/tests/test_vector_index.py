@@ -0,0 +1,101 @@
+"""Test the in-memory vector indexes."""
+
+import asyncio
+
+import numpy as np
+
+from app.services.vector_index import IVFVectorIndex, VectorIndex, recall_at_k
+
+
+class FakeRepository:
+    def __init__(self, vectors: dict[int, list[float]]):
+        self.vectors = vectors
+
+    async def list_embedding_ids(self, embedding_model):
+        return list(self.vectors)
+
+    async def get_embeddings(self, resume_ids):
+        for i in resume_ids:
+            yield {"id": i, "embeddings": self.vectors[i]}
+
+
+def test_search_returns_best_matches_first():
+    index = VectorIndex("model:v1")
+    index.add(1, [1.0, 0.0, 0.0])
+    index.add(2, [0.0, 1.0, 0.0])
+    index.add(3, "[0.7, 0.7, 0.0]")  # pgvector string form
+
+    hits = index.search([1.0, 0.2, 0.0], k=2)
+
+    assert [resume_id for resume_id, _ in hits] == [1, 3]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_remove_keeps_remaining_rows_addressable():
+    index = VectorIndex("model:v1")
+    for i in range(5):
+        vec = np.zeros(5)
+        vec[i] = 1.0
+        index.add(i, vec.tolist())
+
+    index.remove(1)
+    index.remove(4)
+
+    assert len(index) == 3
+    assert index.search([0, 0, 0, 1, 0], k=1)[0][0] == 3
+    assert {i for i, _ in index.search([1, 1, 1, 1, 1], k=10)} == {0, 2, 3}
+
+
+def test_sync_adds_and_drops_rows():
+    index = VectorIndex("model:v1")
+    index.add(99, [1.0, 1.0])
+    repo = FakeRepository({1: [1.0, 0.0], 2: [0.0, 1.0]})
+
+    asyncio.run(index.sync(repo.list_embedding_ids, repo.get_embeddings))
+
+    assert index.loaded
+    assert index.ids() == {1, 2}
+
+
+def _clustered(n=3000, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((20, dim))
+    return centres[rng.integers(0, 20, n)] + 0.3 * rng.standard_normal((n, dim))
+
+
+def test_ivf_recall_against_exact_search():
+    vectors = _clustered()
+    exact = VectorIndex("model:v1")
+    ivf = IVFVectorIndex("model:v1", nlist=32, nprobe=8, min_train_size=1)
+    for i, vec in enumerate(vectors):
+        exact.add(i, vec)
+        ivf.add(i, vec)
+    ivf.maintain()
+    assert ivf.trained
+
+    # Rows added after training are assigned to a partition incrementally
+    ivf.add(10_000, vectors[0])
+    exact.add(10_000, vectors[0])
+    ivf.remove(5)
+    exact.remove(5)
+
+    assert recall_at_k(ivf, exact, vectors[:50], k=10) >= 0.9
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "index.npz"
+    vectors = _clustered(n=500)
+    ivf = IVFVectorIndex("model:v1", path, nlist=8, min_train_size=1)
+    for i, vec in enumerate(vectors):
+        ivf.add(i, vec)
+    ivf.train()
+    ivf.save()
+
+    restored = IVFVectorIndex("model:v1", path, nlist=8, min_train_size=1)
+    assert restored.load()
+    assert restored.trained and len(restored) == 500
+    assert restored.search(vectors[7], k=3) == ivf.search(vectors[7], k=3)
+
+    # Snapshots from another embedding model or backend are ignored
+    assert not IVFVectorIndex("model:v2", path).load()
+    assert not VectorIndex("model:v1", path).load()
@@ -3,7 +3,7 @@
 import React, { useEffect, useState, useMemo } from "react";
 import { useRouter } from "next/navigation";
 import { toast } from "sonner";
-import { getMatches, deleteMatch, type Match } from "@/lib/api";
+import { getMatchesPage, deleteMatch, type Match } from "@/lib/api";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/Card";
 import { Badge } from "@/components/ui/Badge";
 import { Briefcase, FileText, Calendar, Search, XCircle, Trash2, ArrowRight, Loader2 } from "lucide-react";
@@ -15,13 +15,16 @@ export default function MatchesPage() {
     const [loading, setLoading] = useState(true);
     const [search, setSearch] = useState("");
     const [deletingId, setDeletingId] = useState<number | null>(null);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const router = useRouter();
 
     useEffect(() => {
         const fetchMatches = async () => {
             try {
-                const data = await getMatches();
-                setMatches(data);
+                const page = await getMatchesPage();
+                setMatches(page.matches);
+                setNextCursor(page.nextCursor);
             } catch (error: unknown) {
                 console.error("Failed to fetch matches", error);
                 toast.error("Failed to load match history.");
@@ -42,6 +45,19 @@ export default function MatchesPage() {
         );
     }, [search, matches]);
 
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const page = await getMatchesPage(nextCursor);
+            setMatches(prev => [...prev, ...page.matches]);
+            setNextCursor(page.nextCursor);
+        } catch {
+            toast.error("Failed to load more matches.");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleDelete = async (e: React.MouseEvent, id: number) => {
         e.stopPropagation();
         setDeletingId(id);
@@ -177,6 +193,15 @@ export default function MatchesPage() {
                     </div>
                 )}
             </div>
+
+            {!loading && nextCursor && (
+                <div className="flex justify-center">
+                    <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                        {loadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                        Load more
+                    </Button>
+                </div>
+            )}
         </div>
     );
 }
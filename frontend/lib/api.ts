@@ -2,7 +2,8 @@ export async function apiCall<T>(
   endpoint: string,
   options: RequestInit = {},
   retries = 2,
-  retryDelay = 500
+  retryDelay = 500,
+  onResponse?: (res: Response) => void
 ): Promise<T> {
   const baseUrl = process.env.NEXT_PUBLIC_API_BASE_URL;
 
@@ -33,6 +34,7 @@ export async function apiCall<T>(
         const text = await res.text();
         throw new Error(`API error: ${res.status} ${res.statusText} - ${text}`);
       }
+      onResponse?.(res);
 
       const text = await res.text();
       try {
@@ -109,6 +111,21 @@ export const getMatches = async (): Promise<Match[]> => {
   return apiCall<Match[]>("/resume/matches");
 };
 
+export interface MatchPage {
+  matches: Match[];
+  nextCursor: string | null;
+}
+
+// Match history is keyset-paginated; the next page's cursor comes back in a header
+export const getMatchesPage = async (cursor?: string | null): Promise<MatchPage> => {
+  let nextCursor: string | null = null;
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const matches = await apiCall<Match[]>(`/resume/matches${query}`, {}, 2, 500, (res) => {
+    nextCursor = res.headers.get("X-Next-Cursor");
+  });
+  return { matches, nextCursor };
+};
+
 
 export interface JobDescriptionRequest {
   description: string;
@@ -132,10 +149,21 @@ export interface AnalysisResponse {
   error?: string;
 }
 
+export interface CircuitBreakerSnapshot {
+  state: "closed" | "open" | "half_open";
+  recent_calls: number;
+  failure_rate: number;
+  avg_latency_seconds: number | null;
+  retry_in_seconds: number;
+  last_error: string | null;
+  seconds_since_success: number | null;
+}
+
 export interface OllamaStatus {
-  status: "online" | "offline";
+  status: "online" | "offline" | "degraded" | "unknown";
   model: string;
   available_models: string[];
+  breaker: CircuitBreakerSnapshot;
 }
 
 